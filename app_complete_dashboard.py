@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
 from datetime import datetime
-import io
 from io import BytesIO
-from insights_engine import FinancialInsightsEngine
-from data_transformer import DataTransformer
+
+# plotly, insights_engine and data_transformer are imported inside the
+# branches that use them so the welcome screen renders without loading them
+
+QUARTER_COLUMNS = frozenset(('Q1', 'Q2', 'Q3', 'Q4', 'FY'))
+QUARTERS_ONLY = frozenset(('Q1', 'Q2', 'Q3', 'Q4'))
 
 # Page configuration
 st.set_page_config(
@@ -57,15 +59,18 @@ if 'initialized' not in st.session_state:
     st.session_state.data_loaded = False
     st.session_state.sample_data_loaded = False
 
+# Fiscal quarter information (April-March fiscal year)
+FISCAL_QUARTERS = {
+    'Q1': 'Apr-Jun',
+    'Q2': 'Jul-Sep',
+    'Q3': 'Oct-Dec',
+    'Q4': 'Jan-Mar',
+    'FY': 'Full Year'
+}
+
 def get_fiscal_quarter_info():
     """Return fiscal quarter information (April-March fiscal year)"""
-    return {
-        'Q1': 'Apr-Jun',
-        'Q2': 'Jul-Sep',
-        'Q3': 'Oct-Dec',
-        'Q4': 'Jan-Mar',
-        'FY': 'Full Year'
-    }
+    return FISCAL_QUARTERS
 
 def create_sample_data():
     """Create sample financial data matching the target dashboard"""
@@ -231,13 +236,14 @@ if uploaded_file:
             st.info(f"📊 File contains {len(preview_df)} rows and {len(preview_df.columns)} columns")
         
         # Check if data needs transformation
-        has_quarters = any(col in preview_df.columns for col in ['Q1', 'Q2', 'Q3', 'Q4', 'FY'])
+        has_quarters = bool(QUARTER_COLUMNS.intersection(preview_df.columns))
         
         if not has_quarters:
             st.warning("⚠️ No quarterly columns detected. This appears to be transaction-level data.")
             st.info("🔄 **Auto-Transform Available:** We can convert your transaction data into quarterly format!")
             
             # Show transformation options
+            from data_transformer import DataTransformer
             transformer = DataTransformer()
             date_cols = transformer.detect_date_columns(preview_df)
             value_cols = transformer.detect_value_columns(preview_df)
@@ -287,6 +293,7 @@ if uploaded_file:
                         
                         # Store transformed data
                         st.session_state.uploaded_df = transformed_df
+                        st.session_state.numeric_cols = transformed_df.select_dtypes(include=['number']).columns.tolist()
                         st.session_state.original_df = preview_df
                         st.session_state.transformation_summary = summary
                         st.session_state.data_loaded = True
@@ -304,6 +311,7 @@ if uploaded_file:
             if st.button("📤 Load Quarterly Data", type="primary"):
                 try:
                     st.session_state.uploaded_df = preview_df
+                    st.session_state.numeric_cols = preview_df.select_dtypes(include=['number']).columns.tolist()
                     st.session_state.data_loaded = True
                     st.session_state.sample_data_loaded = False
                     
@@ -318,6 +326,7 @@ if uploaded_file:
 
 # Display data
 if st.session_state.sample_data_loaded or st.session_state.data_loaded:
+    import plotly.graph_objects as go
     
     if st.session_state.sample_data_loaded:
         # Use sample data
@@ -488,6 +497,7 @@ if st.session_state.sample_data_loaded or st.session_state.data_loaded:
         st.markdown("### 🤖 AI-Powered Insights & Recommendations")
         
         # Generate insights
+        from insights_engine import FinancialInsightsEngine
         insights_engine = FinancialInsightsEngine()
         insights = insights_engine.analyze_quarterly_data(forecast_df)
         variance_insights = insights_engine.analyze_variance(forecast_df, budget_df)
@@ -634,7 +644,7 @@ if st.session_state.sample_data_loaded or st.session_state.data_loaded:
         st.markdown("## 📊 Your Uploaded Data - Dashboard View")
         
         # Check if data has quarterly columns
-        has_quarters = any(col in df.columns for col in ['Q1', 'Q2', 'Q3', 'Q4', 'FY'])
+        has_quarters = bool(QUARTER_COLUMNS.intersection(df.columns))
         
         if has_quarters:
             # Display in dashboard format
@@ -645,7 +655,7 @@ if st.session_state.sample_data_loaded or st.session_state.data_loaded:
             st.dataframe(df, use_container_width=True, height=600)
             
             # Key Metrics if numeric columns exist
-            numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+            numeric_cols = st.session_state.numeric_cols
             
             if len(numeric_cols) >= 3:
                 st.markdown("---")
@@ -663,7 +673,7 @@ if st.session_state.sample_data_loaded or st.session_state.data_loaded:
                                 st.metric(str(fy_value)[:20], f"${fy_amount:,.1f}M" if pd.notna(fy_amount) else "N/A")
             
             # Quarterly visualization
-            if all(q in df.columns for q in ['Q1', 'Q2', 'Q3', 'Q4']):
+            if QUARTERS_ONLY.issubset(df.columns):
                 st.markdown("---")
                 st.markdown("### 📊 Quarterly Trend")
                 
@@ -709,7 +719,7 @@ if st.session_state.sample_data_loaded or st.session_state.data_loaded:
                 st.dataframe(df, use_container_width=True)
             
             with tab2:
-                numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+                numeric_cols = st.session_state.numeric_cols
                 
                 if len(numeric_cols) >= 1:
                     col1, col2 = st.columns(2)
@@ -776,9 +786,11 @@ with st.sidebar:
     st.markdown("## ⚙️ Options")
     
     if st.button("🔄 Reset Dashboard"):
+        changed = st.session_state.data_loaded or st.session_state.sample_data_loaded
         st.session_state.data_loaded = False
         st.session_state.sample_data_loaded = False
-        st.rerun()
+        if changed:
+            st.rerun()
     
     st.markdown("---")
     st.markdown("### 📅 Fiscal Year Calendar")
@@ -1,16 +1,18 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import io
 import re
+import hashlib
+import importlib.util
+import openpyxl
 
 # Import existing modules
-from validation_engine import ForecastValidationEngine
-from advanced_analytics import AdvancedAnalytics
 from pl_processor import PLDataProcessor
+from processed_cache import processed_cache_key, load_processed, save_processed, clear_session_processed
+
+# plotly is imported inside the chart builders so the upload steps render without loading it
 
 # Page configuration
 st.set_page_config(
@@ -62,6 +64,17 @@ def init_session_state():
         st.session_state.forecast_monthly_cols = None
     if 'pl_detection_results' not in st.session_state:
         st.session_state.pl_detection_results = None
+    if 'forecast_processed' not in st.session_state:
+        st.session_state.forecast_processed = False
+    if 'pl_processed' not in st.session_state:
+        st.session_state.pl_processed = False
+    if 'data_integrated' not in st.session_state:
+        st.session_state.data_integrated = False
+
+@st.cache_resource
+def get_pl_processor():
+    """Shared P&L processor; it holds no per-upload state"""
+    return PLDataProcessor()
 
 def show_workflow_sidebar():
     """Enhanced sidebar with dual file workflow status"""
@@ -69,17 +82,17 @@ def show_workflow_sidebar():
     
     # Forecast file status
     st.sidebar.markdown("### 📊 Forecast Data")
-    forecast_uploaded = hasattr(st.session_state, 'forecast_processed') and st.session_state.forecast_processed
+    forecast_uploaded = st.session_state.forecast_processed
     st.sidebar.markdown(f"{'✅' if forecast_uploaded else '⏳'} Forecast File")
     
     # P&L file status
     st.sidebar.markdown("### 💰 P&L Data")
-    pl_uploaded = hasattr(st.session_state, 'pl_processed') and st.session_state.pl_processed
+    pl_uploaded = st.session_state.pl_processed
     st.sidebar.markdown(f"{'✅' if pl_uploaded else '⏳'} P&L File")
     
     # Integration status
     st.sidebar.markdown("### 🔗 Integration")
-    integrated = hasattr(st.session_state, 'data_integrated') and st.session_state.data_integrated
+    integrated = st.session_state.data_integrated
     st.sidebar.markdown(f"{'✅' if integrated else '⏳'} Data Aggregation")
     
     st.sidebar.markdown("---")
@@ -89,141 +102,185 @@ def show_workflow_sidebar():
         st.rerun()
     
     if st.sidebar.button("🗑️ Clear All Data"):
+        clear_session_processed()
         for key in list(st.session_state.keys()):
             if not key.startswith('_'):
                 del st.session_state[key]
         st.sidebar.success("Data cleared!")
         st.rerun()
 
-def read_file_smart(file):
+# python-calamine is optional; when installed pandas parses .xlsx much faster with it
+EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') else None
+
+def _detect_header_row(rows):
+    """Pick the header row from the first rows of the sheet without parsing the whole file"""
+    # Same rule as pandas' "Unnamed" check: fewer than 30% blank header cells
+    for header_row, values in enumerate(rows):
+        blank_count = sum(1 for value in values if pd.isna(value) or str(value).strip() == '')
+        if values and blank_count < len(values) * 0.3:
+            return header_row
+    return 0
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _read_bytes(file_hash, _data, name):
+    """Parse uploaded file bytes; cached on file_hash, since Streamlit skips hashing _data"""
+    if name.endswith('.csv'):
+        # Multi-threaded Arrow parser when pyarrow is available and the file suits it. Unlike the
+        # default parser it types ISO date cells as datetime.date objects and timestamps as datetime64
+        # instead of leaving them as strings; the detection code only reads those cells via astype(str).
+        # ImportError: no pyarrow; ValueError: options or data Arrow can't handle (ArrowInvalid)
+        try:
+            return pd.read_csv(io.BytesIO(_data), engine='pyarrow')
+        except (ImportError, ValueError):
+            return pd.read_csv(io.BytesIO(_data))
+    
+    if EXCEL_ENGINE:
+        # Probe and parse on one calamine workbook; pandas before 2.2 has no calamine engine,
+        # so any failure here falls back to openpyxl below
+        try:
+            with pd.ExcelFile(io.BytesIO(_data), engine=EXCEL_ENGINE) as workbook:
+                top_rows = workbook.parse(0, header=None, nrows=3)
+                header_row = _detect_header_row(top_rows.itertuples(index=False, name=None))
+                return workbook.parse(0, header=header_row)
+        except Exception:
+            pass
+    
+    try:
+        workbook = openpyxl.load_workbook(io.BytesIO(_data), read_only=True, data_only=True)
+    except Exception:
+        workbook = None
+    
+    if workbook is not None:
+        rows = workbook.worksheets[0].iter_rows(min_row=1, max_row=3, values_only=True)
+        # Hand the open workbook to pandas so the zip container is only decoded once
+        return pd.read_excel(workbook, header=_detect_header_row(rows), engine='openpyxl')
+    
+    # Legacy .xls files can't be scanned with openpyxl, so probe with pandas
+    for header_row in [0, 1, 2]:
+        try:
+            test_df = pd.read_excel(io.BytesIO(_data), header=header_row)
+            unnamed_count = sum(1 for col in test_df.columns if 'Unnamed' in str(col))
+            if unnamed_count < len(test_df.columns) * 0.3:
+                return test_df
+        except:
+            continue
+    return pd.read_excel(io.BytesIO(_data), header=0)
+
+def file_digest(file):
+    """Content hash of an uploaded file, used as the cache key for parsing and processing"""
+    return hashlib.blake2b(file.getvalue(), digest_size=16).hexdigest()
+
+def read_file_smart(file, file_hash):
     """Smart file reader"""
     try:
-        # Reset file pointer
-        file.seek(0)
-        
-        if file.name.endswith('.csv'):
-            df = pd.read_csv(file)
-        else:
-            df = None
-            for header_row in [0, 1, 2]:
-                try:
-                    file.seek(0)
-                    test_df = pd.read_excel(file, header=header_row)
-                    unnamed_count = sum(1 for col in test_df.columns if 'Unnamed' in str(col))
-                    if unnamed_count < len(test_df.columns) * 0.3:
-                        df = test_df
-                        break
-                except:
-                    continue
-            if df is None:
-                file.seek(0)
-                df = pd.read_excel(file, header=0)
-        return df
+        return _read_bytes(file_hash, file.getvalue(), file.name)
     except Exception as e:
         st.error(f"❌ Error reading file: {e}")
         return None
 
+# Column names that look like monthly/quarterly periods, and the year inside them
+MONTHLY_COLUMN_PATTERN = re.compile(r'FY20[23]|20(?:2[4-9]|30)-|Q[1-4] ')
+YEAR_PATTERN = re.compile(r'(202[0-9]|203[0-9])')
+# "FY2024-03" / "2024-03" style names; anything else is treated as January of this year
+PERIOD_PATTERN = re.compile(r'^\s*(?:FY)?\s*(\d+)\s*-\s*(\d+)\s*(?:-|$)')
+
+@st.cache_data(show_spinner=False)
 def find_monthly_columns(df):
     """Find monthly columns in forecast data"""
-    monthly_patterns = ['FY202', 'FY203', '2024-', '2025-', '2026-', '2027-', '2028-', '2029-', '2030-', 'Q1 ', 'Q2 ', 'Q3 ', 'Q4 ']
-    monthly_cols = []
     current_year = datetime.now().year
+    is_candidate = np.asarray(df.columns.astype(str).str.contains(MONTHLY_COLUMN_PATTERN), dtype=bool)
+    if not is_candidate.any():
+        return []
+    
+    # One coercion pass over all candidate columns (positional, so duplicate names are safe)
+    candidates = df.iloc[:, np.flatnonzero(is_candidate)]
+    numeric_counts = candidates.apply(pd.to_numeric, errors='coerce').notna().sum().to_numpy()
+    years = (
+        pd.Series(candidates.columns.astype(str))
+        .str.extract(YEAR_PATTERN)[0]
+        .fillna(current_year)
+        .astype(int)
+    )
     
-    for col in df.columns:
-        col_str = str(col)
-        if any(pattern in col_str for pattern in monthly_patterns):
-            try:
-                numeric_count = pd.to_numeric(df[col], errors='coerce').notna().sum()
-                if numeric_count > 0:
-                    year = extract_year_from_column(col)
-                    monthly_cols.append({
-                        'name': col,
-                        'year': year,
-                        'is_future': year > current_year,
-                        'is_historical': year <= current_year
-                    })
-            except:
-                continue
-    return monthly_cols
-
-def extract_year_from_column(col_name):
-    """Extract year from column name"""
-    col_str = str(col_name)
-    year_match = re.search(r'(202[0-9]|203[0-9])', col_str)
-    if year_match:
-        return int(year_match.group(1))
-    return datetime.now().year
+    return [
+        {
+            'name': col,
+            'year': year,
+            'is_future': year > current_year,
+            'is_historical': year <= current_year
+        }
+        for col, year, count in zip(candidates.columns, years.tolist(), numeric_counts)
+        if count > 0
+    ]
 
 def process_forecast_data(df, mapping, monthly_cols):
     """Process forecast data"""
-    projects = []
-    for idx, row in df.iterrows():
-        project = {
-            'project_id': row.get(mapping.get('id', ''), f"PROJ_{idx+1}"),
-            'name': row.get(mapping.get('name', ''), f"Project {idx+1}"),
-            'client': row.get(mapping.get('client', ''), "Unknown"),
-            'status': row.get(mapping.get('status', ''), "Active"),
-            'offering': row.get(mapping.get('offering', ''), "Not Specified"),
-            'industry': row.get(mapping.get('industry', ''), "Not Specified"),
-        }
-        
-        total_value = row.get(mapping.get('total_value', ''), 0)
-        try:
-            project['total_value'] = float(total_value) if pd.notna(total_value) else 0
-        except:
-            project['total_value'] = 0
-        projects.append(project)
-    
-    projects_df = pd.DataFrame(projects)
-    
-    # Process monthly data
-    monthly_data = []
-    for idx, row in df.iterrows():
-        project_id = row.get(mapping.get('id', ''), f"PROJ_{idx+1}")
-        for col_info in monthly_cols:
-            col = col_info['name']
-            value = row[col]
-            if pd.notna(value) and value != 0:
-                try:
-                    revenue = float(value)
-                    if revenue > 0:
-                        year, month = parse_date_from_column(col)
-                        monthly_data.append({
-                            'project_id': project_id,
-                            'year': year,
-                            'month': month,
-                            'revenue': revenue,
-                            'period': f"{year}-{month:02d}",
-                            'is_historical': col_info['is_historical'],
-                            'is_future': col_info['is_future']
-                        })
-                except:
-                    continue
-    
-    monthly_df = pd.DataFrame(monthly_data)
+    row_numbers = pd.RangeIndex(1, len(df) + 1).astype(str)
+    project_fields = [
+        ('project_id', 'id', 'PROJ_' + row_numbers),
+        ('name', 'name', 'Project ' + row_numbers),
+        ('client', 'client', "Unknown"),
+        ('status', 'status', "Active"),
+        ('offering', 'offering', "Not Specified"),
+        ('industry', 'industry', "Not Specified"),
+    ]
+    
+    # Mapped fields come straight from the source column, unmapped ones get defaults.
+    # Plain arrays on a fresh RangeIndex avoid index alignment and a reset_index copy.
+    projects = {}
+    for field, key, default in project_fields:
+        col = mapping.get(key)
+        projects[field] = df[col].to_numpy() if col in df.columns else default
+    
+    value_col = mapping.get('total_value')
+    if value_col in df.columns:
+        projects['total_value'] = pd.to_numeric(df[value_col], errors='coerce').fillna(0.0).to_numpy()
+    else:
+        projects['total_value'] = 0.0
+    
+    projects_df = pd.DataFrame(projects, index=pd.RangeIndex(len(df)), copy=False)
+    
+    # Process monthly data: wide monthly columns -> one row per project/month
+    col_info = parse_dates_from_columns([c['name'] for c in monthly_cols])
+    col_info['is_historical'] = np.array([c['is_historical'] for c in monthly_cols], dtype=bool)
+    col_info['is_future'] = np.array([c['is_future'] for c in monthly_cols], dtype=bool)
+    
+    col_info['period'] = col_info['year'].astype(str) + '-' + col_info['month'].astype(str).str.zfill(2)
+    
+    # Coerce column by column, then pick out the positive cells in row-major order
+    revenue_block = (
+        df[col_info.index.tolist()]
+        .apply(pd.to_numeric, errors='coerce')
+        .to_numpy(dtype=float, na_value=np.nan)
+    )
+    row_idx, col_idx = np.nonzero(revenue_block > 0)
+    
+    # Build the long table column by column from the per-column lookups
+    monthly_df = pd.DataFrame({
+        'project_id': projects_df['project_id'].to_numpy()[row_idx],
+        'year': col_info['year'].to_numpy()[col_idx],
+        'month': col_info['month'].to_numpy()[col_idx],
+        'revenue': revenue_block[row_idx, col_idx],
+        'period': col_info['period'].to_numpy()[col_idx],
+        'is_historical': col_info['is_historical'].to_numpy()[col_idx],
+        'is_future': col_info['is_future'].to_numpy()[col_idx]
+    }, copy=False)
+    
     return projects_df, monthly_df
 
-def parse_date_from_column(col_name):
-    """Parse date from column name"""
-    col_str = str(col_name)
-    if 'FY' in col_str and '-' in col_str:
-        try:
-            parts = col_str.split('-')
-            year = int(parts[0].replace('FY', ''))
-            month = int(parts[1])
-            return year, month
-        except:
-            pass
-    if '-' in col_str:
-        try:
-            parts = col_str.split('-')
-            if len(parts) >= 2:
-                year = int(parts[0])
-                month = int(parts[1])
-                return year, month
-        except:
-            pass
-    return datetime.now().year, 1
+def compact_dtypes(df, columns, amount_columns=()):
+    """Store repeated strings as categoricals and amounts as float32 to shrink session state"""
+    dtypes = {col: 'category' for col in columns if col in df.columns}
+    dtypes.update({col: np.float32 for col in amount_columns if col in df.columns})
+    return df.astype(dtypes)
+
+def parse_dates_from_columns(col_names):
+    """Parse year and month from period column names, defaulting to January of the current year"""
+    parts = pd.Series(col_names, dtype=object).astype(str).str.extract(PERIOD_PATTERN)
+    return pd.DataFrame({
+        'year': pd.to_numeric(parts[0]).fillna(datetime.now().year).astype(int).to_numpy(),
+        'month': pd.to_numeric(parts[1]).fillna(1).astype(int).to_numpy()
+    }, index=pd.Index(col_names, name='column', dtype=object))
 
 def main():
     """Main application with dual file upload"""
@@ -239,14 +296,11 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Check if both files are processed
-    both_processed = (hasattr(st.session_state, 'forecast_processed') and st.session_state.forecast_processed and
-                     hasattr(st.session_state, 'pl_processed') and st.session_state.pl_processed)
-    
-    if not both_processed:
-        show_dual_upload_section()
-    else:
+    # The analysis tabs need the integrated data, so stay on the upload page until then
+    if st.session_state.data_integrated:
         show_integrated_analysis()
+    else:
+        show_dual_upload_section()
 
 def show_dual_upload_section():
     """Show dual file upload interface with fixed state management"""
@@ -273,16 +327,19 @@ def show_dual_upload_section():
             
             if forecast_file:
                 with st.spinner("Reading forecast file..."):
-                    df = read_file_smart(forecast_file)
+                    file_hash = file_digest(forecast_file)
+                    df = read_file_smart(forecast_file, file_hash)
                     if df is not None:
                         st.session_state.forecast_df = df
+                        st.session_state.forecast_preview = df.head(10).copy()
+                        st.session_state.forecast_file_hash = file_hash
                         st.session_state.forecast_monthly_cols = find_monthly_columns(df)
                         st.session_state.forecast_file_uploaded = True
                         st.success("✅ File uploaded successfully!")
                         st.rerun()
         
         # Step 2: Show Preview and Mapping
-        elif st.session_state.forecast_file_uploaded and not hasattr(st.session_state, 'forecast_processed'):
+        elif st.session_state.forecast_file_uploaded and not st.session_state.forecast_processed:
             st.success("✅ File uploaded")
             
             df = st.session_state.forecast_df
@@ -297,7 +354,9 @@ def show_dual_upload_section():
                     st.metric("Columns", len(df.columns))
                 with col_c:
                     st.metric("Monthly Cols", len(monthly_cols) if monthly_cols else 0)
-                st.dataframe(df.head(10), use_container_width=True)
+                # Expander bodies run even when collapsed, so only send the rows on request
+                if st.checkbox("Show first 10 rows", key="forecast_show_preview"):
+                    st.dataframe(st.session_state.forecast_preview, use_container_width=True)
             
             # Mapping interface
             st.markdown("**Step 2: Map Columns**")
@@ -336,10 +395,29 @@ def show_dual_upload_section():
                     if mapping and monthly_cols:
                         with st.spinner("Processing forecast data..."):
                             try:
-                                projects_df, monthly_df = process_forecast_data(df, mapping, monthly_cols)
+                                cache_key = processed_cache_key('dual_forecast', st.session_state.forecast_file_hash, mapping)
+                                cached = load_processed(cache_key, ['projects', 'monthly'])
+                                if cached:
+                                    projects_df, monthly_df = cached
+                                else:
+                                    projects_df, monthly_df = process_forecast_data(df, mapping, monthly_cols)
+                                    save_processed(cache_key, {'projects': projects_df, 'monthly': monthly_df})
                                 
-                                st.session_state.forecast_projects_df = projects_df
-                                st.session_state.forecast_monthly_df = monthly_df
+                                st.session_state.forecast_projects_df = compact_dtypes(
+                                    projects_df, ['project_id', 'client', 'status', 'offering', 'industry']
+                                )
+                                st.session_state.forecast_monthly_df = compact_dtypes(
+                                    monthly_df, ['project_id', 'period'], ['revenue']
+                                )
+                                # Aggregates come from the full-precision frame, before the float32 cast
+                                st.session_state.forecast_num_periods = monthly_df['period'].nunique()
+                                st.session_state.forecast_period_revenue = (
+                                    monthly_df.groupby('period')['revenue'].sum().reset_index()
+                                )
+                                st.session_state.forecast_top_projects = (
+                                    monthly_df.groupby('project_id')['revenue'].sum().nlargest(10).reset_index()
+                                )
+                                st.session_state.forecast_total_revenue = float(monthly_df['revenue'].sum())
                                 st.session_state.forecast_processed = True
                                 
                                 st.success("✅ Forecast data processed!")
@@ -357,10 +435,10 @@ def show_dual_upload_section():
                 st.rerun()
         
         # Step 3: Show completion status
-        elif hasattr(st.session_state, 'forecast_processed') and st.session_state.forecast_processed:
+        elif st.session_state.forecast_processed:
             st.success("✅ Forecast data loaded and processed")
             st.metric("Projects", len(st.session_state.forecast_projects_df))
-            st.metric("Revenue Periods", st.session_state.forecast_monthly_df['period'].nunique())
+            st.metric("Revenue Periods", st.session_state.forecast_num_periods)
             
             if st.button("🔄 Upload New Forecast File", key="new_forecast"):
                 st.session_state.forecast_file_uploaded = False
@@ -387,19 +465,22 @@ def show_dual_upload_section():
             
             if pl_file:
                 with st.spinner("Reading P&L file..."):
-                    df = read_file_smart(pl_file)
+                    file_hash = file_digest(pl_file)
+                    df = read_file_smart(pl_file, file_hash)
                     if df is not None:
-                        pl_processor = PLDataProcessor()
+                        pl_processor = get_pl_processor()
                         detection_results = pl_processor.find_pl_columns(df)
                         
                         st.session_state.pl_df_raw = df
+                        st.session_state.pl_preview = df.head(10).copy()
+                        st.session_state.pl_file_hash = file_hash
                         st.session_state.pl_detection_results = detection_results
                         st.session_state.pl_file_uploaded = True
                         st.success("✅ File uploaded successfully!")
                         st.rerun()
         
         # Step 2: Show Preview and Mapping
-        elif st.session_state.pl_file_uploaded and not hasattr(st.session_state, 'pl_processed'):
+        elif st.session_state.pl_file_uploaded and not st.session_state.pl_processed:
             st.success("✅ File uploaded")
             
             df = st.session_state.pl_df_raw
@@ -412,7 +493,8 @@ def show_dual_upload_section():
                     st.metric("Rows", len(df))
                 with col_b:
                     st.metric("Columns", len(df.columns))
-                st.dataframe(df.head(10), use_container_width=True)
+                if st.checkbox("Show first 10 rows", key="pl_show_preview"):
+                    st.dataframe(st.session_state.pl_preview, use_container_width=True)
             
             # Show detected categories
             if detection_results.get('categorized_items'):
@@ -462,10 +544,21 @@ def show_dual_upload_section():
                     if mapping['line_item'] and monthly_cols:
                         with st.spinner("Processing P&L data..."):
                             try:
-                                pl_processor = PLDataProcessor()
-                                pl_df, pl_summary_df = pl_processor.process_pl_data(df, mapping, monthly_cols)
+                                pl_processor = get_pl_processor()
+                                cache_key = processed_cache_key('dual_pl', st.session_state.pl_file_hash, mapping)
+                                cached = load_processed(cache_key, ['pl', 'pl_summary'])
+                                if cached:
+                                    pl_df, pl_summary_df = cached
+                                else:
+                                    pl_df, pl_summary_df = pl_processor.process_pl_data(df, mapping, monthly_cols)
+                                    save_processed(cache_key, {'pl': pl_df, 'pl_summary': pl_summary_df})
                                 
-                                st.session_state.pl_df = pl_df
+                                # Period stays a plain string: it is filtered and regrouped during integration
+                                st.session_state.pl_df = compact_dtypes(
+                                    pl_df, ['entity', 'line_item', 'category'], ['amount']
+                                )
+                                st.session_state.pl_num_line_items = pl_df['line_item'].nunique()
+                                st.session_state.pl_num_periods = pl_df['period'].nunique()
                                 st.session_state.pl_summary_df = pl_summary_df
                                 st.session_state.pl_processed = True
                                 
@@ -484,10 +577,10 @@ def show_dual_upload_section():
                 st.rerun()
         
         # Step 3: Show completion status
-        elif hasattr(st.session_state, 'pl_processed') and st.session_state.pl_processed:
+        elif st.session_state.pl_processed:
             st.success("✅ P&L data loaded and processed")
-            st.metric("Line Items", len(st.session_state.pl_df['line_item'].unique()))
-            st.metric("Periods", st.session_state.pl_df['period'].nunique())
+            st.metric("Line Items", st.session_state.pl_num_line_items)
+            st.metric("Periods", st.session_state.pl_num_periods)
             
             if st.button("🔄 Upload New P&L File", key="new_pl"):
                 st.session_state.pl_file_uploaded = False
@@ -498,9 +591,8 @@ def show_dual_upload_section():
         st.markdown('</div>', unsafe_allow_html=True)
     
     # ==================== INTEGRATION BUTTON ====================
-    if (hasattr(st.session_state, 'forecast_processed') and st.session_state.forecast_processed and
-        hasattr(st.session_state, 'pl_processed') and st.session_state.pl_processed and
-        not hasattr(st.session_state, 'data_integrated')):
+    both_processed = st.session_state.forecast_processed and st.session_state.pl_processed
+    if both_processed and not st.session_state.data_integrated:
         
         st.markdown("---")
         st.markdown("## 🔗 Ready to Integrate!")
@@ -508,7 +600,7 @@ def show_dual_upload_section():
         if st.button("🚀 Integrate & Analyze Data", type="primary", use_container_width=True):
             with st.spinner("Integrating datasets..."):
                 try:
-                    pl_processor = PLDataProcessor()
+                    pl_processor = get_pl_processor()
                     
                     # Aggregate data
                     combined_df = pl_processor.aggregate_forecast_and_pl(
@@ -615,34 +707,74 @@ def show_executive_summary():
             else:
                 st.info(f"ℹ️ **{rec['message']}**\n\n*Action:* {rec['action']}")
 
+@st.cache_data(show_spinner=False)
+def _build_bar_fig(data, x, title, labels=None):
+    """Build a single-series revenue bar chart (cached per dataset)"""
+    import plotly.express as px
+    
+    return px.bar(data, x=x, y='revenue', title=title, labels=labels)
+
+@st.cache_data(show_spinner=False)
+def _build_margin_fig(pl_summary):
+    """Build the gross margin trend line (cached per P&L summary)"""
+    import plotly.express as px
+    
+    return px.line(
+        pl_summary,
+        x='period',
+        y='gross_margin_%',
+        title="Gross Margin Trend",
+        labels={'gross_margin_%': 'Gross Margin (%)', 'period': 'Period'}
+    )
+
+@st.cache_data(show_spinner=False)
+def _build_variance_fig(combined_df):
+    """Build the forecast vs P&L grouped bar chart (cached per combined dataset)"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        x=combined_df['period'],
+        y=combined_df['forecast_revenue'],
+        name='Forecast Revenue',
+        marker_color='lightblue'
+    ))
+    
+    fig.add_trace(go.Bar(
+        x=combined_df['period'],
+        y=combined_df['pl_revenue'],
+        name='P&L Revenue',
+        marker_color='lightgreen'
+    ))
+    
+    fig.update_layout(
+        title="Forecast vs P&L Revenue Comparison",
+        xaxis_title="Period",
+        yaxis_title="Revenue ($)",
+        barmode='group'
+    )
+    return fig
+
 def show_revenue_analysis():
     """Revenue analysis from forecast data"""
     st.markdown("### 📈 Revenue Forecast Analysis")
     
-    forecast_df = st.session_state.forecast_monthly_df
-    
-    # Revenue by period chart
-    period_revenue = forecast_df.groupby('period')['revenue'].sum().reset_index()
-    
-    fig = px.bar(
-        period_revenue,
-        x='period',
-        y='revenue',
-        title="Forecast Revenue by Period",
+    # Revenue by period chart (aggregated when the forecast was processed)
+    fig = _build_bar_fig(
+        st.session_state.forecast_period_revenue,
+        'period',
+        "Forecast Revenue by Period",
         labels={'revenue': 'Revenue ($)', 'period': 'Period'}
     )
     st.plotly_chart(fig, use_container_width=True)
     
     # Project breakdown
     st.markdown("### 📊 Project Revenue Breakdown")
-    project_revenue = forecast_df.groupby('project_id')['revenue'].sum().reset_index()
-    project_revenue = project_revenue.sort_values('revenue', ascending=False).head(10)
-    
-    fig2 = px.bar(
-        project_revenue,
-        x='project_id',
-        y='revenue',
-        title="Top 10 Projects by Revenue"
+    fig2 = _build_bar_fig(
+        st.session_state.forecast_top_projects,
+        'project_id',
+        "Top 10 Projects by Revenue"
     )
     st.plotly_chart(fig2, use_container_width=True)
 
@@ -658,14 +790,7 @@ def show_pl_analysis():
         
         # Margin trends
         if 'gross_margin_%' in pl_summary.columns:
-            fig = px.line(
-                pl_summary,
-                x='period',
-                y='gross_margin_%',
-                title="Gross Margin Trend",
-                labels={'gross_margin_%': 'Gross Margin (%)', 'period': 'Period'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(_build_margin_fig(pl_summary), use_container_width=True)
 
 def show_variance_analysis():
     """Variance analysis between forecast and P&L"""
@@ -675,30 +800,7 @@ def show_variance_analysis():
     
     if not combined_df.empty:
         # Variance chart
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            x=combined_df['period'],
-            y=combined_df['forecast_revenue'],
-            name='Forecast Revenue',
-            marker_color='lightblue'
-        ))
-        
-        fig.add_trace(go.Bar(
-            x=combined_df['period'],
-            y=combined_df['pl_revenue'],
-            name='P&L Revenue',
-            marker_color='lightgreen'
-        ))
-        
-        fig.update_layout(
-            title="Forecast vs P&L Revenue Comparison",
-            xaxis_title="Period",
-            yaxis_title="Revenue ($)",
-            barmode='group'
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(_build_variance_fig(combined_df), use_container_width=True)
         
         # Variance table
         st.markdown("### 📋 Detailed Variance Analysis")
@@ -715,7 +817,7 @@ def show_integrated_forecasting():
     
     with col1:
         st.markdown("#### 📊 Forecast Scenarios")
-        forecast_total = st.session_state.forecast_monthly_df['revenue'].sum()
+        forecast_total = st.session_state.forecast_total_revenue
         
         scenarios = {
             'Conservative (85%)': forecast_total * 0.85,
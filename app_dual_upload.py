@@ -6,6 +6,8 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import io
 import re
+import openpyxl
+from concurrent.futures import ThreadPoolExecutor
 
 # Import existing modules
 from validation_engine import ForecastValidationEngine
@@ -57,97 +59,191 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Forecast scenarios as multiples of the total pipeline
+SCENARIO_LABELS = ('Conservative (85%)', 'Most Likely (100%)', 'Optimistic (115%)')
+SCENARIO_FACTORS = np.array([0.85, 1.0, 1.15])
+
+# Above this many periods the variance chart is aggregated to quarters
+MAX_CHART_PERIODS = 2000
+
+# Row cap for full tables sent to the browser
+MAX_TABLE_ROWS = 500
+
+def show_table(df):
+    """Display a table capped at MAX_TABLE_ROWS rows"""
+    st.dataframe(df.head(MAX_TABLE_ROWS), use_container_width=True)
+    if len(df) > MAX_TABLE_ROWS:
+        st.caption(f"Showing first {MAX_TABLE_ROWS:,} of {len(df):,} rows")
+
 def show_status_badge(status, label=""):
     """Display status badges"""
     icons = {'complete': '✅', 'pending': '⏳', 'in_progress': '🔄', 'error': '❌'}
     icon = icons.get(status, '❓')
     st.markdown(f'<span class="status-badge status-{status}">{icon} {label}</span>', unsafe_allow_html=True)
 
+@st.cache_resource
+def get_pl_processor():
+    """Shared P&L processor; it holds no per-upload state"""
+    return PLDataProcessor()
+
 def show_workflow_sidebar():
     """Enhanced sidebar with dual file workflow status"""
-    st.sidebar.markdown("## 🎯 Workflow Status")
-    
-    # Forecast file status
-    st.sidebar.markdown("### 📊 Forecast Data")
-    forecast_uploaded = hasattr(st.session_state, 'forecast_processed') and st.session_state.forecast_processed
-    st.sidebar.markdown(f"{'✅' if forecast_uploaded else '⏳'} Forecast File")
-    
-    # P&L file status
-    st.sidebar.markdown("### 💰 P&L Data")
-    pl_uploaded = hasattr(st.session_state, 'pl_processed') and st.session_state.pl_processed
-    st.sidebar.markdown(f"{'✅' if pl_uploaded else '⏳'} P&L File")
-    
-    # Integration status
-    st.sidebar.markdown("### 🔗 Integration")
-    integrated = hasattr(st.session_state, 'data_integrated') and st.session_state.data_integrated
-    st.sidebar.markdown(f"{'✅' if integrated else '⏳'} Data Aggregation")
-    
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("## ⚡ Quick Actions")
+    forecast_uploaded = st.session_state.get('forecast_processed', False)
+    pl_uploaded = st.session_state.get('pl_processed', False)
+    integrated = st.session_state.get('data_integrated', False)
+    
+    # One markdown block for all static status text (buttons stay separate widgets)
+    st.sidebar.markdown(
+        "## 🎯 Workflow Status\n\n"
+        "### 📊 Forecast Data\n\n"
+        f"{'✅' if forecast_uploaded else '⏳'} Forecast File\n\n"
+        "### 💰 P&L Data\n\n"
+        f"{'✅' if pl_uploaded else '⏳'} P&L File\n\n"
+        "### 🔗 Integration\n\n"
+        f"{'✅' if integrated else '⏳'} Data Aggregation\n\n"
+        "---\n\n"
+        "## ⚡ Quick Actions"
+    )
     
     if st.sidebar.button("🔄 Refresh Data"):
         st.rerun()
     
     if st.sidebar.button("🗑️ Clear All Data"):
-        for key in list(st.session_state.keys()):
-            if not key.startswith('_'):
-                del st.session_state[key]
+        # Keep underscore-prefixed internal keys, drop everything else (including prefetched frames) in one go
+        preserved = {
+            key: st.session_state[key] for key in st.session_state
+            if key.startswith('_') and key not in ('_read_futures', '_prefetch_consumed')
+        }
+        st.session_state.clear()
+        st.session_state.update(preserved)
         st.sidebar.success("Data cleared!")
         st.rerun()
 
+def _detect_header_row(workbook):
+    """Pick the header row from the top of the first sheet without parsing the whole file"""
+    rows = workbook.worksheets[0].iter_rows(min_row=1, max_row=3, values_only=True)
+    
+    # Same rule as pandas' "Unnamed" check: fewer than 30% blank header cells
+    for header_row, values in enumerate(rows):
+        blank_count = sum(1 for value in values if value is None or str(value).strip() == '')
+        if values and blank_count < len(values) * 0.3:
+            return header_row
+    return 0
+
+def _parse_bytes(data, name):
+    """Parse uploaded file bytes"""
+    if name.endswith('.csv'):
+        # Multi-threaded Arrow parser when pyarrow is available and the file suits it. Unlike the
+        # default parser it types ISO date cells as datetime.date objects and timestamps as datetime64
+        # instead of leaving them as strings; the detection code only reads those cells via astype(str).
+        # ImportError: no pyarrow; ValueError: options or data Arrow can't handle (ArrowInvalid)
+        try:
+            return pd.read_csv(io.BytesIO(data), engine='pyarrow')
+        except (ImportError, ValueError):
+            return pd.read_csv(io.BytesIO(data))
+    
+    try:
+        workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    except Exception:
+        workbook = None
+    
+    if workbook is not None:
+        # Hand the open workbook to pandas so the file is only unzipped and parsed once
+        return pd.read_excel(workbook, header=_detect_header_row(workbook), engine='openpyxl')
+    
+    # Legacy .xls files can't be scanned with openpyxl, so probe with pandas
+    for header_row in [0, 1, 2]:
+        try:
+            test_df = pd.read_excel(io.BytesIO(data), header=header_row)
+            unnamed_count = sum(1 for col in test_df.columns if 'Unnamed' in str(col))
+            if unnamed_count < len(test_df.columns) * 0.3:
+                return test_df
+        except:
+            continue
+    return pd.read_excel(io.BytesIO(data), header=0)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _read_bytes(data, name):
+    """Parse uploaded file bytes, cached on the file contents"""
+    return _parse_bytes(data, name)
+
+def prefetch_uploads(files):
+    """Start parsing uploaded files in the background so Process finds them ready"""
+    if '_io_pool' not in st.session_state:
+        st.session_state._io_pool = ThreadPoolExecutor(max_workers=2)
+    pool = st.session_state._io_pool
+    futures = st.session_state.get('_read_futures', {})
+    
+    # Files whose prefetched frame was already handed out are read through the cache from then on
+    file_ids = {file.file_id for file in files}
+    consumed = st.session_state.get('_prefetch_consumed', set()) & file_ids
+    st.session_state._prefetch_consumed = consumed
+    
+    # Worker threads have no script context, so they run the uncached parser
+    st.session_state._read_futures = {
+        file.file_id: futures.get(file.file_id) or pool.submit(_parse_bytes, file.getvalue(), file.name)
+        for file in files
+        if file.file_id not in consumed
+    }
+
 def read_file_smart(file):
     """Smart file reader"""
     try:
-        if file.name.endswith('.csv'):
-            df = pd.read_csv(file)
-        else:
-            df = None
-            for header_row in [0, 1, 2]:
-                try:
-                    test_df = pd.read_excel(file, header=header_row)
-                    unnamed_count = sum(1 for col in test_df.columns if 'Unnamed' in str(col))
-                    if unnamed_count < len(test_df.columns) * 0.3:
-                        df = test_df
-                        break
-                except:
-                    continue
-            if df is None:
-                df = pd.read_excel(file, header=0)
-        return df
+        # Drop the future once its frame is handed out so session state doesn't keep it alive
+        future = st.session_state.get('_read_futures', {}).pop(file.file_id, None)
+        if future is not None:
+            st.session_state.setdefault('_prefetch_consumed', set()).add(file.file_id)
+            return future.result()
+        return _read_bytes(file.getvalue(), file.name)
     except Exception as e:
         st.error(f"❌ Error reading file: {e}")
         return None
 
+# Column names that look like monthly/quarterly periods, and the year inside them
+MONTHLY_COLUMN_PATTERN = re.compile(r'FY20[23]|20(?:2[4-9]|30)-|Q[1-4] ')
+YEAR_PATTERN = re.compile(r'(202[0-9]|203[0-9])')
+# "FY2024-03" / "2024-03" style names; anything else is treated as January of this year
+PERIOD_PATTERN = re.compile(r'^\s*(?:FY)?\s*(\d+)\s*-\s*(\d+)\s*(?:-|$)')
+
+def _has_numeric_values(series):
+    """True if any cell in the column parses as a number"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.notna().any()
+    
+    # Mixed object columns usually show a number early on, so try a small sample first
+    values = series.dropna()
+    if pd.to_numeric(values.head(64), errors='coerce').notna().any():
+        return True
+    return pd.to_numeric(values.iloc[64:], errors='coerce').notna().any()
+
+@st.cache_data(show_spinner=False)
 def find_monthly_columns(df):
     """Find monthly columns in forecast data"""
-    monthly_patterns = ['FY202', 'FY203', '2024-', '2025-', '2026-', '2027-', '2028-', '2029-', '2030-', 'Q1 ', 'Q2 ', 'Q3 ', 'Q4 ']
-    monthly_cols = []
     current_year = datetime.now().year
+    is_candidate = np.asarray(df.columns.astype(str).str.contains(MONTHLY_COLUMN_PATTERN), dtype=bool)
+    if not is_candidate.any():
+        return []
+    
+    # Positional selection so duplicate column names behave like the per-column loop did
+    candidates = df.iloc[:, np.flatnonzero(is_candidate)]
+    has_numbers = [_has_numeric_values(series) for _, series in candidates.items()]
+    years = (
+        pd.Series(candidates.columns.astype(str))
+        .str.extract(YEAR_PATTERN)[0]
+        .fillna(current_year)
+        .astype(int)
+    )
     
-    for col in df.columns:
-        col_str = str(col)
-        if any(pattern in col_str for pattern in monthly_patterns):
-            try:
-                numeric_count = pd.to_numeric(df[col], errors='coerce').notna().sum()
-                if numeric_count > 0:
-                    year = extract_year_from_column(col)
-                    monthly_cols.append({
-                        'name': col,
-                        'year': year,
-                        'is_future': year > current_year,
-                        'is_historical': year <= current_year
-                    })
-            except:
-                continue
-    return monthly_cols
-
-def extract_year_from_column(col_name):
-    """Extract year from column name"""
-    col_str = str(col_name)
-    year_match = re.search(r'(202[0-9]|203[0-9])', col_str)
-    if year_match:
-        return int(year_match.group(1))
-    return datetime.now().year
+    return [
+        {
+            'name': col,
+            'year': year,
+            'is_future': year > current_year,
+            'is_historical': year <= current_year
+        }
+        for col, year, keep in zip(candidates.columns, years.tolist(), has_numbers)
+        if keep
+    ]
 
 def create_forecast_mapping_interface(df, monthly_cols):
     """Create mapping interface for forecast data"""
@@ -185,76 +281,79 @@ def create_forecast_mapping_interface(df, monthly_cols):
     
     return mapping
 
+@st.cache_data(show_spinner=False)
 def process_forecast_data(df, mapping, monthly_cols):
     """Process forecast data"""
-    projects = []
-    for idx, row in df.iterrows():
-        project = {
-            'project_id': row.get(mapping.get('id', ''), f"PROJ_{idx+1}"),
-            'name': row.get(mapping.get('name', ''), f"Project {idx+1}"),
-            'client': row.get(mapping.get('client', ''), "Unknown"),
-            'status': row.get(mapping.get('status', ''), "Active"),
-            'offering': row.get(mapping.get('offering', ''), "Not Specified"),
-            'industry': row.get(mapping.get('industry', ''), "Not Specified"),
-        }
-        
-        total_value = row.get(mapping.get('total_value', ''), 0)
-        try:
-            project['total_value'] = float(total_value) if pd.notna(total_value) else 0
-        except:
-            project['total_value'] = 0
-        projects.append(project)
-    
-    projects_df = pd.DataFrame(projects)
-    
-    # Process monthly data
-    monthly_data = []
-    for idx, row in df.iterrows():
-        project_id = row.get(mapping.get('id', ''), f"PROJ_{idx+1}")
-        for col_info in monthly_cols:
-            col = col_info['name']
-            value = row[col]
-            if pd.notna(value) and value != 0:
-                try:
-                    revenue = float(value)
-                    if revenue > 0:
-                        year, month = parse_date_from_column(col)
-                        monthly_data.append({
-                            'project_id': project_id,
-                            'year': year,
-                            'month': month,
-                            'revenue': revenue,
-                            'period': f"{year}-{month:02d}",
-                            'is_historical': col_info['is_historical'],
-                            'is_future': col_info['is_future']
-                        })
-                except:
-                    continue
-    
-    monthly_df = pd.DataFrame(monthly_data)
+    project_fields = {
+        'project_id': 'id', 'name': 'name', 'client': 'client', 'status': 'status',
+        'offering': 'offering', 'industry': 'industry', 'total_value': 'total_value'
+    }
+    
+    # Project mapped columns straight out of the source frame and rename them in one step
+    mapped = {field: mapping.get(key) for field, key in project_fields.items() if mapping.get(key) in df.columns}
+    projects_df = df[list(mapped.values())].set_axis(list(mapped), axis=1)
+    
+    # Unmapped fields get their defaults
+    row_numbers = pd.Series(np.arange(1, len(df) + 1), index=df.index).astype(str)
+    defaults = {
+        'project_id': 'PROJ_' + row_numbers,
+        'name': 'Project ' + row_numbers,
+        'client': "Unknown",
+        'status': "Active",
+        'offering': "Not Specified",
+        'industry': "Not Specified",
+        'total_value': 0.0,
+    }
+    projects_df = projects_df.assign(**{
+        field: default for field, default in defaults.items() if field not in mapped
+    })[list(project_fields)]
+    projects_df['total_value'] = pd.to_numeric(projects_df['total_value'], errors='coerce').fillna(0.0)
+    
+    # Process monthly data: one lookup row per monthly column, then melt to one row per project/month
+    meta = parse_dates_from_columns([c['name'] for c in monthly_cols])
+    meta['is_historical'] = np.array([c['is_historical'] for c in monthly_cols], dtype=bool)
+    meta['is_future'] = np.array([c['is_future'] for c in monthly_cols], dtype=bool)
+    meta['period'] = pd.Categorical(meta['year'].astype(str) + '-' + meta['month'].astype(str).str.zfill(2))
+    
+    long_df = (
+        df[meta.index.tolist()]
+        .assign(project_id=projects_df['project_id'])
+        .melt(id_vars='project_id', var_name='col', value_name='revenue')
+    )
+    long_df['revenue'] = pd.to_numeric(long_df['revenue'], errors='coerce')
+    long_df = long_df[long_df['revenue'] > 0].join(meta, on='col')
+    
+    monthly_df = long_df[
+        ['project_id', 'year', 'month', 'revenue', 'period', 'is_historical', 'is_future']
+    ].reset_index(drop=True)
+    
+    # Repeated labels as categoricals: smaller session state and integer-coded groupbys
+    projects_df = projects_df.reset_index(drop=True).astype(
+        {col: 'category' for col in ['project_id', 'client', 'status', 'offering', 'industry']}
+    )
+    monthly_df['project_id'] = monthly_df['project_id'].astype('category')
+    
     return projects_df, monthly_df
 
-def parse_date_from_column(col_name):
-    """Parse date from column name"""
-    col_str = str(col_name)
-    if 'FY' in col_str and '-' in col_str:
-        try:
-            parts = col_str.split('-')
-            year = int(parts[0].replace('FY', ''))
-            month = int(parts[1])
-            return year, month
-        except:
-            pass
-    if '-' in col_str:
-        try:
-            parts = col_str.split('-')
-            if len(parts) >= 2:
-                year = int(parts[0])
-                month = int(parts[1])
-                return year, month
-        except:
-            pass
-    return datetime.now().year, 1
+@st.cache_data(show_spinner=False)
+def summarize_forecast(monthly_df):
+    """Revenue by period, by project and in total, computed once per processed forecast"""
+    return {
+        'period_revenue': monthly_df.groupby('period', sort=True, observed=True)['revenue'].sum().reset_index(),
+        'project_revenue': (
+            monthly_df.groupby('project_id', observed=True)['revenue'].sum()
+            .sort_values(ascending=False).reset_index()
+        ),
+        'forecast_total': float(monthly_df['revenue'].sum())
+    }
+
+def parse_dates_from_columns(col_names):
+    """Parse year and month from period column names, defaulting to January of the current year"""
+    parts = pd.Series(col_names, dtype=object).astype(str).str.extract(PERIOD_PATTERN)
+    return pd.DataFrame({
+        'year': pd.to_numeric(parts[0]).fillna(datetime.now().year).astype(int).to_numpy(),
+        'month': pd.to_numeric(parts[1]).fillna(1).astype(int).to_numpy()
+    }, index=pd.Index(col_names, name='col', dtype=object))
 
 def main():
     """Main application with dual file upload"""
@@ -269,20 +368,20 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Check if both files are processed
-    both_processed = (hasattr(st.session_state, 'forecast_processed') and st.session_state.forecast_processed and
-                     hasattr(st.session_state, 'pl_processed') and st.session_state.pl_processed)
-    
-    if not both_processed:
-        show_dual_upload_section()
-    else:
+    # The analysis tabs need the integrated data, so stay on the upload page until then
+    if st.session_state.get('data_integrated', False):
         show_integrated_analysis()
+    else:
+        show_dual_upload_section()
 
 def show_dual_upload_section():
     """Show dual file upload interface"""
     
     st.markdown("## 📁 Data Upload")
     
+    forecast_processed = st.session_state.get('forecast_processed', False)
+    pl_processed = st.session_state.get('pl_processed', False)
+    
     # Create two columns for dual upload
     col1, col2 = st.columns(2)
     
@@ -300,12 +399,16 @@ def show_dual_upload_section():
         )
         
         if forecast_file:
-            if st.button("📊 Process Forecast File", key="process_forecast"):
+            process_clicked = st.button("📊 Process Forecast File", key="process_forecast")
+            # Filled after the click branch from session state, so the preview survives later reruns
+            preview_area = st.empty()
+            
+            if process_clicked:
                 with st.spinner("Processing forecast data..."):
                     try:
                         df = read_file_smart(forecast_file)
                         if df is not None:
-                            st.dataframe(df.head(5), use_container_width=True)
+                            st.session_state.forecast_preview = (forecast_file.file_id, df.head(5).copy())
                             
                             monthly_cols = find_monthly_columns(df)
                             if monthly_cols:
@@ -316,6 +419,7 @@ def show_dual_upload_section():
                                     
                                     st.session_state.forecast_projects_df = projects_df
                                     st.session_state.forecast_monthly_df = monthly_df
+                                    st.session_state.forecast_aggregates = summarize_forecast(monthly_df)
                                     st.session_state.forecast_processed = True
                                     
                                     st.success("✅ Forecast data processed!")
@@ -324,8 +428,12 @@ def show_dual_upload_section():
                                 st.warning("No monthly columns detected")
                     except Exception as e:
                         st.error(f"Error: {e}")
+            
+            preview_id, preview = st.session_state.get('forecast_preview', (None, None))
+            if preview_id == forecast_file.file_id:
+                preview_area.dataframe(preview, use_container_width=True)
         
-        if hasattr(st.session_state, 'forecast_processed') and st.session_state.forecast_processed:
+        if forecast_processed:
             st.success("✅ Forecast data loaded")
             st.metric("Projects", len(st.session_state.forecast_projects_df))
             st.metric("Revenue Periods", st.session_state.forecast_monthly_df['period'].nunique())
@@ -346,14 +454,18 @@ def show_dual_upload_section():
         )
         
         if pl_file:
-            if st.button("💰 Process P&L File", key="process_pl"):
+            process_clicked = st.button("💰 Process P&L File", key="process_pl")
+            # Filled after the click branch from session state, so the preview survives later reruns
+            preview_area = st.empty()
+            
+            if process_clicked:
                 with st.spinner("Processing P&L data..."):
                     try:
                         df = read_file_smart(pl_file)
                         if df is not None:
-                            st.dataframe(df.head(5), use_container_width=True)
+                            st.session_state.pl_preview = (pl_file.file_id, df.head(5).copy())
                             
-                            pl_processor = PLDataProcessor()
+                            pl_processor = get_pl_processor()
                             detection_results = pl_processor.find_pl_columns(df)
                             
                             mapping, monthly_cols = pl_processor.create_pl_mapping_interface(df, detection_results)
@@ -369,31 +481,29 @@ def show_dual_upload_section():
                                 st.rerun()
                     except Exception as e:
                         st.error(f"Error: {e}")
+            
+            preview_id, preview = st.session_state.get('pl_preview', (None, None))
+            if preview_id == pl_file.file_id:
+                preview_area.dataframe(preview, use_container_width=True)
         
-        if hasattr(st.session_state, 'pl_processed') and st.session_state.pl_processed:
+        if pl_processed:
             st.success("✅ P&L data loaded")
             st.metric("Line Items", len(st.session_state.pl_df['line_item'].unique()))
             st.metric("Periods", st.session_state.pl_df['period'].nunique())
         
         st.markdown('</div>', unsafe_allow_html=True)
     
+    # Both files present: parse them in parallel ahead of the Process clicks
+    if forecast_file and pl_file and not (forecast_processed and pl_processed):
+        prefetch_uploads([forecast_file, pl_file])
+    
     # Integration button (only show when both files are processed)
-    if (hasattr(st.session_state, 'forecast_processed') and st.session_state.forecast_processed and
-        hasattr(st.session_state, 'pl_processed') and st.session_state.pl_processed):
+    if forecast_processed and pl_processed:
         
         st.markdown("---")
         if st.button("🔗 Integrate & Analyze Data", type="primary", use_container_width=True):
             with st.spinner("Integrating datasets..."):
-                pl_processor = PLDataProcessor()
-                
-                # Aggregate data
-                combined_df = pl_processor.aggregate_forecast_and_pl(
-                    st.session_state.forecast_monthly_df,
-                    st.session_state.pl_df
-                )
-                
-                # Generate insights
-                insights = pl_processor.generate_integrated_insights(
+                combined_df, insights = integrate_forecast_and_pl(
                     st.session_state.forecast_monthly_df,
                     st.session_state.pl_df,
                     st.session_state.pl_summary_df
@@ -401,12 +511,33 @@ def show_dual_upload_section():
                 
                 st.session_state.combined_df = combined_df
                 st.session_state.insights = insights
+                
+                # Scenario values and the historical variance used by the forecasting tab
+                forecast_total = st.session_state.forecast_aggregates['forecast_total']
+                historical_variance = combined_df.loc[combined_df['pl_revenue'] > 0, 'variance_%']
+                st.session_state.scenario_values = SCENARIO_FACTORS * forecast_total
+                st.session_state.avg_variance_pct = (
+                    historical_variance.mean() if not historical_variance.empty else None
+                )
                 st.session_state.data_integrated = True
                 
                 st.success("✅ Data integrated successfully!")
                 st.balloons()
                 st.rerun()
 
+@st.cache_data(show_spinner=False)
+def integrate_forecast_and_pl(forecast_monthly_df, pl_df, pl_summary_df):
+    """Aggregate forecast and P&L data and generate insights, cached on the input frames"""
+    pl_processor = get_pl_processor()
+    
+    # Aggregate data
+    combined_df = pl_processor.aggregate_forecast_and_pl(forecast_monthly_df, pl_df)
+    
+    # Generate insights
+    insights = pl_processor.generate_integrated_insights(forecast_monthly_df, pl_df, pl_summary_df)
+    
+    return combined_df, insights
+
 def show_integrated_analysis():
     """Show integrated analysis dashboard"""
     
@@ -493,10 +624,10 @@ def show_revenue_analysis():
     """Revenue analysis from forecast data"""
     st.markdown("### 📈 Revenue Forecast Analysis")
     
-    forecast_df = st.session_state.forecast_monthly_df
+    aggregates = st.session_state.forecast_aggregates
     
     # Revenue by period chart
-    period_revenue = forecast_df.groupby('period')['revenue'].sum().reset_index()
+    period_revenue = aggregates['period_revenue']
     
     fig = px.bar(
         period_revenue,
@@ -509,8 +640,7 @@ def show_revenue_analysis():
     
     # Project breakdown
     st.markdown("### 📊 Project Revenue Breakdown")
-    project_revenue = forecast_df.groupby('project_id')['revenue'].sum().reset_index()
-    project_revenue = project_revenue.sort_values('revenue', ascending=False).head(10)
+    project_revenue = aggregates['project_revenue'].head(10)
     
     fig2 = px.bar(
         project_revenue,
@@ -528,7 +658,7 @@ def show_pl_analysis():
     
     if not pl_summary.empty:
         # Display P&L summary table
-        st.dataframe(pl_summary, use_container_width=True)
+        show_table(pl_summary)
         
         # Margin trends
         if 'gross_margin_%' in pl_summary.columns:
@@ -537,7 +667,8 @@ def show_pl_analysis():
                 x='period',
                 y='gross_margin_%',
                 title="Gross Margin Trend",
-                labels={'gross_margin_%': 'Gross Margin (%)', 'period': 'Period'}
+                labels={'gross_margin_%': 'Gross Margin (%)', 'period': 'Period'},
+                render_mode='webgl'
             )
             st.plotly_chart(fig, use_container_width=True)
 
@@ -548,19 +679,27 @@ def show_variance_analysis():
     combined_df = st.session_state.combined_df
     
     if not combined_df.empty:
-        # Variance chart
+        # Variance chart (rolled up to quarters when there are too many bars to draw)
+        chart_df = combined_df
+        if len(chart_df) > MAX_CHART_PERIODS:
+            quarters = pd.to_datetime(chart_df['period'], errors='coerce').dt.to_period('Q').astype(str)
+            chart_df = (
+                chart_df.groupby(quarters)[['forecast_revenue', 'pl_revenue']].sum()
+                .rename_axis('period').reset_index()
+            )
+        
         fig = go.Figure()
         
         fig.add_trace(go.Bar(
-            x=combined_df['period'],
-            y=combined_df['forecast_revenue'],
+            x=chart_df['period'],
+            y=chart_df['forecast_revenue'],
             name='Forecast Revenue',
             marker_color='lightblue'
         ))
         
         fig.add_trace(go.Bar(
-            x=combined_df['period'],
-            y=combined_df['pl_revenue'],
+            x=chart_df['period'],
+            y=chart_df['pl_revenue'],
             name='P&L Revenue',
             marker_color='lightgreen'
         ))
@@ -569,14 +708,15 @@ def show_variance_analysis():
             title="Forecast vs P&L Revenue Comparison",
             xaxis_title="Period",
             yaxis_title="Revenue ($)",
-            barmode='group'
+            barmode='group',
+            hovermode='x'
         )
         
         st.plotly_chart(fig, use_container_width=True)
         
         # Variance table
         st.markdown("### 📋 Detailed Variance Analysis")
-        st.dataframe(combined_df, use_container_width=True)
+        show_table(combined_df)
 
 def show_integrated_forecasting():
     """Integrated forecasting with P&L insights"""
@@ -584,31 +724,22 @@ def show_integrated_forecasting():
     
     st.info("🚀 **Enhanced Forecasting**: Combining forecast pipeline with P&L actuals for improved accuracy")
     
+    forecast_total = st.session_state.forecast_aggregates['forecast_total']
+    avg_variance = st.session_state.avg_variance_pct
+    
     # Scenario analysis
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("#### 📊 Forecast Scenarios")
-        forecast_total = st.session_state.forecast_monthly_df['revenue'].sum()
-        
-        scenarios = {
-            'Conservative (85%)': forecast_total * 0.85,
-            'Most Likely (100%)': forecast_total,
-            'Optimistic (115%)': forecast_total * 1.15
-        }
-        
-        for scenario, value in scenarios.items():
+        for scenario, value in zip(SCENARIO_LABELS, st.session_state.scenario_values):
             st.metric(scenario, f"${value:,.0f}")
     
     with col2:
         st.markdown("#### 💰 P&L-Adjusted Forecast")
         
-        # Calculate adjustment based on historical variance
-        combined_df = st.session_state.combined_df
-        historical = combined_df[combined_df['pl_revenue'] > 0]
-        
-        if not historical.empty:
-            avg_variance = historical['variance_%'].mean()
+        # Adjustment based on historical variance (computed at integration time)
+        if avg_variance is not None:
             adjusted_forecast = forecast_total * (1 + avg_variance/100)
             
             st.metric(
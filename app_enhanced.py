@@ -1,22 +1,24 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import io
+import importlib.util
+import re
+import hashlib
+from pathlib import Path
 
 # Import our enhancement modules
 from ui_enhancements import (
-    show_progress_indicator, show_status_badge, show_help_tooltip,
-    enhanced_file_uploader, show_data_preview, show_processing_status,
+    show_progress_indicator, status_badge_html, show_help_tooltip,
+    enhanced_file_uploader, show_data_preview,
     enhanced_error_display, auto_save_session_state, show_workflow_sidebar
 )
 from smart_column_detection import show_smart_mapping_interface
-from validation_engine import ForecastValidationEngine
-from advanced_analytics import AdvancedAnalytics
-from advanced_analytics_tab import show_advanced_analytics_tab
-from master_assumptions_tab import show_master_assumptions_tab
+from processed_cache import processed_cache_key, load_processed, save_processed
+
+# The analytics and assumptions tabs (and the plotly/scikit-learn stack behind them) are
+# imported in show_enhanced_tabbed_interface, so the upload steps render without loading them
 
 # Page configuration
 st.set_page_config(
@@ -46,6 +48,10 @@ st.markdown("""
     .status-complete { color: #28a745; }
     .status-pending { color: #ffc107; }
     .status-error { color: #dc3545; }
+    .status-row { display: grid; grid-template-columns: repeat(5, 1fr); gap: 1rem; }
+    .kpi-grid { display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem; margin-bottom: 1rem; }
+    .kpi-label { font-size: 14px; color: #555; }
+    .kpi-value { font-size: 28px; font-weight: 600; }
 </style>
 """, unsafe_allow_html=True)
 
@@ -68,27 +74,36 @@ def main():
     
     # Progress indicator for overall workflow
     workflow_steps = ["Upload", "Detect", "Map", "Process", "Analyze"]
-    current_step = get_current_workflow_step()
-    show_progress_indicator(current_step, len(workflow_steps), workflow_steps)
+    progress_area = st.empty()
+    with progress_area.container():
+        show_progress_indicator(get_current_workflow_step(), len(workflow_steps), workflow_steps)
     
     # Main content area
-    if not hasattr(st.session_state, 'data_processed') or not st.session_state.data_processed:
-        show_data_upload_section()
-    else:
-        show_enhanced_tabbed_interface()
+    if not st.session_state.get('data_processed', False):
+        upload_area = st.empty()
+        with upload_area.container():
+            show_data_upload_section()
+        
+        if not st.session_state.get('data_processed', False):
+            return
+        
+        # Processing finished in this run: swap the upload steps for the analysis tabs
+        # in place instead of re-running the whole script
+        upload_area.empty()
+        with progress_area.container():
+            show_progress_indicator(get_current_workflow_step(), len(workflow_steps), workflow_steps)
+        st.success("✅ Data processing completed successfully!")
+        st.balloons()
+    
+    show_enhanced_tabbed_interface()
 
 def get_current_workflow_step():
     """Determine current workflow step"""
-    if hasattr(st.session_state, 'data_processed') and st.session_state.data_processed:
-        return 5  # Analyze
-    elif hasattr(st.session_state, 'mapping_complete') and st.session_state.mapping_complete:
-        return 4  # Process
-    elif hasattr(st.session_state, 'columns_detected') and st.session_state.columns_detected:
-        return 3  # Map
-    elif hasattr(st.session_state, 'file_uploaded') and st.session_state.file_uploaded:
-        return 2  # Detect
-    else:
-        return 1  # Upload
+    return st.session_state.get('workflow_step', 1)
+
+def advance_workflow(step):
+    """Record that the workflow has reached a step (1 Upload .. 5 Analyze); steps never go back"""
+    st.session_state.workflow_step = max(get_current_workflow_step(), step)
 
 def show_data_upload_section():
     """Enhanced data upload section with smart detection"""
@@ -104,11 +119,19 @@ def show_data_upload_section():
     
     if uploaded_file is not None:
         st.session_state.file_uploaded = True
+        advance_workflow(2)  # Detect
         
         try:
             # Smart file reading
+            # One copy of the upload bytes serves both the content hash and the parse
+            data = uploaded_file.getvalue()
+            file_hash = file_digest(data)
             with st.spinner("Reading file..."):
-                df = read_file_smart(uploaded_file)
+                df = read_file_smart(data, file_hash, uploaded_file.name)
+            del data
+            
+            # Everything below works on the parsed frame, so drop this run's upload buffer now
+            uploaded_file.close()
             
             if df is not None:
                 # Data preview
@@ -123,12 +146,13 @@ def show_data_upload_section():
                 
                 if mapping:
                     st.session_state.columns_detected = True
+                    advance_workflow(3)  # Map
                     st.session_state.smart_mapping = mapping
                     st.session_state.original_df = df
                     
                     # Process data button
                     if st.button("🚀 Process Data with Smart Mapping", type="primary"):
-                        process_data_with_enhancements(df, mapping)
+                        process_data_with_enhancements(df, mapping, file_hash)
                 
         except Exception as e:
             enhanced_error_display(
@@ -142,54 +166,73 @@ def show_data_upload_section():
                 ]
             )
 
-def process_data_with_enhancements(df, mapping):
+def process_data_with_enhancements(df, mapping, file_hash):
     """Enhanced data processing with progress tracking"""
     
-    progress_container = st.empty()
+    # One status box and one progress bar, updated in place for each step
+    status = st.status("Processing data...", expanded=True)
+    progress_bar = status.progress(0.0)
+    total_steps = 5
+    
+    def show_step(step, task):
+        progress_bar.progress(step / total_steps, text=f"{task} ({step}/{total_steps})")
     
     try:
         # Step 1: Validate mapping
-        with progress_container.container():
-            show_processing_status(1, 5, "Validating column mapping...")
+        show_step(1, "Validating column mapping...")
         
         # Step 2: Detect monthly columns
-        with progress_container.container():
-            show_processing_status(2, 5, "Detecting monthly columns...")
+        show_step(2, "Detecting monthly columns...")
         
         monthly_cols = find_monthly_columns_enhanced(df)
         
-        # Step 3: Process project data
-        with progress_container.container():
-            show_processing_status(3, 5, "Processing project data...")
+        # Step 3: Process project data, unless this file and mapping were processed before
+        show_step(3, "Processing project data...")
         
-        projects_df, monthly_df = process_enhanced_data(df, mapping, monthly_cols)
+        cache_key = processed_cache_key('enhanced', file_hash, mapping)
+        cached = load_processed(cache_key, ['projects', 'monthly'])
+        if cached is not None:
+            projects_df, monthly_df = cached
+        else:
+            projects_df, monthly_df = process_enhanced_data(df, mapping, monthly_cols)
+            save_processed(cache_key, {'projects': projects_df, 'monthly': monthly_df})
         
         # Step 4: Generate scenarios
-        with progress_container.container():
-            show_processing_status(4, 5, "Generating forecast scenarios...")
+        show_step(4, "Generating forecast scenarios...")
         
         scenarios = generate_enhanced_scenarios(monthly_df)
         
         # Step 5: Complete processing
-        with progress_container.container():
-            show_processing_status(5, 5, "Finalizing data processing...")
+        show_step(5, "Finalizing data processing...")
         
-        # Store in session state
-        st.session_state.projects_df = projects_df
-        st.session_state.monthly_df = monthly_df
+        # Store in session state with repeated labels as categoricals and revenue as float32;
+        # scenarios above are computed from the full-precision frame
+        st.session_state.projects_df = compact_dtypes(
+            projects_df, ['project_id', 'client', 'status', 'offering', 'product_name', 'industry', 'sales_org']
+        )
+        st.session_state.monthly_df = compact_dtypes(
+            monthly_df, ['project_id', 'column'], ['revenue'], ordered_columns=['period']
+        )
         st.session_state.scenarios = scenarios
+        # Headline metrics for the integrity tab, computed once from the full-precision frame
+        monthly_stats = monthly_df.agg({'period': 'nunique', 'revenue': 'sum'})
+        st.session_state.metrics = {
+            'n_projects': len(projects_df),
+            'n_periods': int(monthly_stats['period']),
+            'total_revenue': float(monthly_stats['revenue']),
+            'quality': calculate_data_quality_score()
+        }
+        st.session_state.quality_checks = run_enhanced_quality_checks()
         st.session_state.mapping = mapping
         st.session_state.monthly_cols = monthly_cols
         st.session_state.data_processed = True
         st.session_state.mapping_complete = True
+        advance_workflow(5)  # Analyze
         
-        progress_container.success("✅ Data processing completed successfully!")
-        
-        # Auto-advance to next section
-        st.balloons()
-        st.rerun()
+        status.update(label="✅ Processing completed successfully!", state="complete", expanded=False)
         
     except Exception as e:
+        status.update(label="❌ Processing failed", state="error")
         enhanced_error_display(
             'data_error',
             str(e),
@@ -203,20 +246,13 @@ def process_data_with_enhancements(df, mapping):
 
 def show_enhanced_tabbed_interface():
     """Enhanced tabbed interface with status indicators"""
+    from advanced_analytics_tab import show_advanced_analytics_tab
+    from master_assumptions_tab import show_master_assumptions_tab
     
-    # Tab status indicators
-    col1, col2, col3, col4, col5 = st.columns(5)
-    
-    with col1:
-        show_status_badge('complete', 'Data Integrity')
-    with col2:
-        show_status_badge('complete', 'Dashboard')
-    with col3:
-        show_status_badge('in_progress', 'Analytics')
-    with col4:
-        show_status_badge('pending', 'Assumptions')
-    with col5:
-        show_status_badge('pending', 'Reports')
+    # Tab status indicators, one grid cell per tab in a single element
+    tab_statuses = ['complete', 'complete', 'in_progress', 'pending', 'pending']
+    badges = "".join(f"<div>{status_badge_html(status)}</div>" for status in tab_statuses)
+    st.markdown(f'<div class="status-row">{badges}</div>', unsafe_allow_html=True)
     
     # Enhanced tabs with tooltips
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -247,46 +283,26 @@ def show_enhanced_data_integrity_tab():
     
     st.markdown("## 🔍 Data Integrity & Quality Assessment")
     
-    # Quick stats dashboard
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric(
-            "📊 Projects Loaded", 
-            len(st.session_state.projects_df),
-            help="Total number of projects in the dataset"
-        )
-    
-    with col2:
-        st.metric(
-            "📅 Time Periods", 
-            st.session_state.monthly_df['period'].nunique(),
-            help="Number of unique monthly periods"
-        )
-    
-    with col3:
-        total_revenue = st.session_state.monthly_df['revenue'].sum()
-        st.metric(
-            "💰 Total Revenue", 
-            f"${total_revenue:,.0f}",
-            help="Sum of all revenue across projects and periods"
-        )
-    
-    with col4:
-        data_quality_score = calculate_data_quality_score()
-        st.metric(
-            "🎯 Quality Score", 
-            f"{data_quality_score}/100",
-            help="Overall data quality assessment"
-        )
+    # Quick stats dashboard, rendered as one grid element
+    metrics = st.session_state.metrics
+    kpis = [
+        ("📊 Projects Loaded", f"{metrics['n_projects']:,}", "Total number of projects in the dataset"),
+        ("📅 Time Periods", f"{metrics['n_periods']:,}", "Number of unique monthly periods"),
+        ("💰 Total Revenue", f"${metrics['total_revenue']:,.0f}", "Sum of all revenue across projects and periods"),
+        ("🎯 Quality Score", f"{metrics['quality']}/100", "Overall data quality assessment"),
+    ]
+    cards = "".join(
+        f'<div class="metric-card" title="{help_text}">'
+        f'<div class="kpi-label">{label}</div><div class="kpi-value">{value}</div></div>'
+        for label, value, help_text in kpis
+    )
+    st.markdown(f'<div class="kpi-grid">{cards}</div>', unsafe_allow_html=True)
     
     # Interactive data quality dashboard
     st.markdown("### 📊 Data Quality Dashboard")
     
     # Quality checks with expandable details
-    quality_checks = run_enhanced_quality_checks()
-    
-    for check_name, check_result in quality_checks.items():
+    for check_name, check_result in st.session_state.quality_checks.items():
         with st.expander(f"{check_result['icon']} {check_name} - {check_result['status']}"):
             st.write(check_result['description'])
             if check_result['details']:
@@ -360,25 +376,207 @@ def show_enhanced_export_tab():
             generate_quality_assessment()
 
 # Helper functions (implementations would go here)
-def read_file_smart(file):
+
+# python-calamine is optional; when installed pandas parses Excel files much faster with it
+EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') else None
+
+# Fallback Excel readers by extension, so pandas doesn't have to sniff the format
+EXCEL_FALLBACK_ENGINES = {'.xlsx': 'openpyxl', '.xlsm': 'openpyxl', '.xls': 'xlrd'}
+
+def _open_excel(data, engine):
+    """Open an uploaded workbook once so the header probe and the full read share it"""
+    return pd.ExcelFile(io.BytesIO(data), engine=engine)
+
+# Parsed and processed frames are never modified after they are built, so they are cached as
+# shared resources: a rerun gets the same object back instead of an unpickled copy
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _read_bytes(file_hash, _data, name):
+    """Parse uploaded file bytes, cached on the content hash"""
+    ext = Path(name).suffix.lower()
+    if ext == '.csv':
+        # Multi-threaded Arrow parser when pyarrow is available and the file suits it. Unlike the
+        # default parser it types ISO date cells as datetime.date objects and timestamps as datetime64
+        # instead of leaving them as strings; the detection code only reads those cells via astype(str).
+        # ImportError: no pyarrow; ValueError: options or data Arrow can't handle (ArrowInvalid)
+        try:
+            return pd.read_csv(io.BytesIO(_data), engine='pyarrow')
+        except (ImportError, ValueError):
+            return pd.read_csv(io.BytesIO(_data))
+    
+    # Calamine streams the sheet in one pass; openpyxl is only the fallback
+    fallback_engine = EXCEL_FALLBACK_ENGINES.get(ext)
+    engine = EXCEL_ENGINE or fallback_engine
+    try:
+        workbook = _open_excel(_data, engine)
+        top_rows = workbook.parse(0, header=None, nrows=3)
+    except Exception:
+        if engine == fallback_engine:
+            raise
+        workbook = _open_excel(_data, fallback_engine)
+        top_rows = workbook.parse(0, header=None, nrows=3)
+    
+    # Pick the header row from the first rows instead of re-parsing the file per candidate
+    header_row = 0
+    for row in range(len(top_rows)):
+        if top_rows.iloc[row].isna().sum() < top_rows.shape[1] * 0.3:
+            header_row = row
+            break
+    
+    with workbook:
+        return workbook.parse(0, header=header_row)
+
+def file_digest(data):
+    """Content hash of uploaded file bytes, used as the cache key for parsing and processing"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def read_file_smart(data, file_hash, name):
     """Smart file reader with enhanced error handling"""
-    # Implementation from original app_tabbed.py
-    pass
+    try:
+        return _read_bytes(file_hash, data, name)
+    except Exception as e:
+        st.error(f"❌ Error reading file: {e}")
+        return None
 
+# Column names that look like monthly/quarterly periods, and the year/month inside them
+MONTHLY_COLUMN_PATTERN = re.compile(r'FY20[23]|20(?:2[4-9]|30)-|Q[1-4] ')
+YEAR_PATTERN = re.compile(r'(202[0-9]|203[0-9])')
+PERIOD_PATTERN = r'^\s*(?:FY)?\s*(\d+)\s*-\s*(\d+)\s*(?:-|$)'
+
+@st.cache_data(show_spinner=False)
 def find_monthly_columns_enhanced(df):
     """Enhanced monthly column detection"""
-    # Implementation with smart detection
-    pass
+    current_year = datetime.now().year
+    is_candidate = np.asarray(df.columns.astype(str).str.contains(MONTHLY_COLUMN_PATTERN), dtype=bool)
+    if not is_candidate.any():
+        return []
+    
+    # One coercion pass over all candidate columns (positional, so duplicate names are safe)
+    candidates = df.iloc[:, np.flatnonzero(is_candidate)]
+    numeric_counts = candidates.apply(pd.to_numeric, errors='coerce').notna().sum().to_numpy()
+    years = (
+        pd.Series(candidates.columns.astype(str))
+        .str.extract(YEAR_PATTERN)[0]
+        .fillna(current_year)
+        .astype(int)
+    )
+    
+    # Categorize as historical vs future
+    return [
+        {
+            'name': col,
+            'year': year,
+            'is_future': year > current_year,
+            'is_historical': year <= current_year
+        }
+        for col, year, count in zip(candidates.columns, years.tolist(), numeric_counts)
+        if count > 0
+    ]
+
+def parse_dates_from_columns(col_names):
+    """Parse year and month from period column names, defaulting to January of the current year"""
+    parts = pd.Series(col_names, dtype=object).astype(str).str.extract(PERIOD_PATTERN)
+    return pd.DataFrame({
+        'year': pd.to_numeric(parts[0]).fillna(datetime.now().year).astype(int).to_numpy(),
+        'month': pd.to_numeric(parts[1]).fillna(1).astype(int).to_numpy()
+    }, index=pd.Index(col_names, name='column', dtype=object))
 
+@st.cache_resource(show_spinner=False, max_entries=4)
 def process_enhanced_data(df, mapping, monthly_cols):
     """Enhanced data processing"""
-    # Implementation from original app_tabbed.py
-    pass
+    row_numbers = pd.RangeIndex(1, len(df) + 1).astype(str)
+    project_fields = [
+        ('project_id', 'id', 'PROJ_' + row_numbers),
+        ('name', 'name', 'Project ' + row_numbers),
+        ('client', 'client', "Unknown"),
+        ('status', 'status', "Active"),
+        ('offering', 'offering', "Not Specified"),
+        ('product_name', 'product_name', "Not Specified"),
+        ('industry', 'industry', "Not Specified"),
+        ('sales_org', 'sales_org', "Not Specified"),
+    ]
+    
+    # Create projects dataframe with business dimensions: mapped fields come straight
+    # from the source column, unmapped ones get defaults
+    projects = {}
+    for field, key, default in project_fields:
+        col = mapping.get(key)
+        projects[field] = df[col].to_numpy() if col in df.columns else default
+    
+    value_col = mapping.get('total_value')
+    if value_col in df.columns:
+        projects['total_value'] = pd.to_numeric(df[value_col], errors='coerce').fillna(0.0).to_numpy()
+    else:
+        projects['total_value'] = 0.0
+    
+    projects_df = pd.DataFrame(projects, index=pd.RangeIndex(len(df)), copy=False)
+    
+    # Process monthly data: dates are parsed once per column, not once per cell
+    col_info = parse_dates_from_columns([c['name'] for c in monthly_cols])
+    col_info['is_historical'] = np.array([c['is_historical'] for c in monthly_cols], dtype=bool)
+    col_info['is_future'] = np.array([c['is_future'] for c in monthly_cols], dtype=bool)
+    col_info['period'] = col_info['year'].astype(str) + '-' + col_info['month'].astype(str).str.zfill(2)
+    
+    # Reshape wide -> long as one numeric block: coerce, then pick the positive cells
+    # in row-major order (project by project, columns left to right)
+    revenue_block = (
+        df[col_info.index.tolist()]
+        .apply(pd.to_numeric, errors='coerce')
+        .to_numpy(dtype=float, copy=False)
+    )
+    row_idx, col_idx = np.nonzero(revenue_block > 0)
+    
+    monthly_df = pd.DataFrame({
+        'project_id': projects_df['project_id'].to_numpy()[row_idx],
+        'year': col_info['year'].to_numpy()[col_idx],
+        'month': col_info['month'].to_numpy()[col_idx],
+        'column': col_info.index.to_numpy()[col_idx],
+        'revenue': revenue_block[row_idx, col_idx],
+        'period': col_info['period'].to_numpy()[col_idx],
+        'is_historical': col_info['is_historical'].to_numpy()[col_idx],
+        'is_future': col_info['is_future'].to_numpy()[col_idx]
+    }, copy=False)
+    
+    return projects_df, monthly_df
+
+def compact_dtypes(df, columns, amount_columns=(), ordered_columns=()):
+    """Store repeated strings as categoricals and amounts as float32 to shrink session state"""
+    dtypes = {col: 'category' for col in columns if col in df.columns}
+    dtypes.update({col: np.float32 for col in amount_columns if col in df.columns})
+    # Sortable labels such as 'YYYY-MM' periods get ordered categories in calendar order
+    dtypes.update({
+        col: pd.CategoricalDtype(np.sort(df[col].unique()), ordered=True)
+        for col in ordered_columns if col in df.columns
+    })
+    return df.astype(dtypes)
+
+# Forecast scenarios as multiples of the processed revenue
+SCENARIO_MULTIPLIERS = {'Conservative': 0.85, 'Most Likely': 1.00, 'Optimistic': 1.15}
 
 def generate_enhanced_scenarios(monthly_df):
     """Generate enhanced scenarios"""
-    # Implementation from original app_tabbed.py
-    pass
+    # Group once; every scenario is the same monthly totals scaled by its multiplier
+    base_totals = monthly_df.groupby(['year', 'month']).agg(
+        revenue=('revenue', 'sum'),
+        project_id=('project_id', 'nunique')
+    ).reset_index()
+    base_revenue = base_totals.pop('revenue').to_numpy()
+    base_totals['period'] = base_totals['year'].astype(str) + '-' + base_totals['month'].astype(str).str.zfill(2)
+    
+    # Periods x scenarios in one broadcast multiply
+    multipliers = np.array(list(SCENARIO_MULTIPLIERS.values()))
+    adjusted = base_revenue[:, np.newaxis] * multipliers
+    totals = adjusted.sum(axis=0)
+    n_periods = len(base_totals)
+    
+    return {
+        scenario_name: {
+            'multiplier': multiplier,
+            'total_revenue': float(totals[i]),
+            'monthly_totals': base_totals.assign(revenue_adjusted=adjusted[:, i]),
+            'avg_monthly': float(totals[i]) / n_periods if n_periods > 0 else 0
+        }
+        for i, (scenario_name, multiplier) in enumerate(SCENARIO_MULTIPLIERS.items())
+    }
 
 def calculate_data_quality_score():
     """Calculate overall data quality score"""
@@ -411,16 +609,53 @@ def show_real_time_metrics(scenario):
     # Implementation for real-time metrics
     pass
 
+def offer_download(df, name):
+    """Offer a frame as a Parquet download, or CSV when pyarrow is missing or can't encode it"""
+    date_tag = datetime.now().strftime('%Y%m%d')
+    try:
+        data = df.to_parquet(index=False, compression='zstd')
+        file_name, mime = f"{name}_{date_tag}.parquet", "application/vnd.apache.parquet"
+    except (ImportError, TypeError, ValueError):
+        data = df.to_csv(index=False).encode('utf-8')
+        file_name, mime = f"{name}_{date_tag}.csv", "text/csv"
+    
+    st.download_button(
+        label=f"⬇️ Download {file_name}",
+        data=data,
+        file_name=file_name,
+        mime=mime
+    )
+
 def export_forecast_data():
     """Export forecast data"""
+    offer_download(st.session_state.monthly_df, "forecast_data")
     st.success("Forecast data exported successfully!")
 
 def export_project_summary():
     """Export project summary"""
+    # Session revenue is stored as float32; sum in float64 so the totals stay exact to the dollar
+    monthly_df = st.session_state.monthly_df
+    project_revenue = (
+        monthly_df['revenue'].astype('float64').groupby(monthly_df['project_id'], observed=True).sum()
+        .rename('forecast_revenue').reset_index()
+    )
+    summary = st.session_state.projects_df.merge(project_revenue, on='project_id', how='left')
+    summary['forecast_revenue'] = summary['forecast_revenue'].fillna(0.0)
+    offer_download(summary, "project_summary")
     st.success("Project summary exported successfully!")
 
 def export_quality_report():
     """Export quality report"""
+    report = pd.DataFrame([
+        {
+            'check': check_name,
+            'status': check_result['status'],
+            'description': check_result['description'],
+            'details': str(check_result['details'])
+        }
+        for check_name, check_result in st.session_state.quality_checks.items()
+    ])
+    offer_download(report, "quality_report")
     st.success("Quality report exported successfully!")
 
 def generate_executive_summary():
@@ -5,7 +5,9 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import io
+import os
 import re
+import importlib.util
 
 # Import existing modules
 from validation_engine import ForecastValidationEngine
@@ -13,6 +15,18 @@ from advanced_analytics import AdvancedAnalytics
 from advanced_analytics_tab import show_advanced_analytics_tab
 from master_assumptions_tab import show_master_assumptions_tab
 
+# python-calamine is optional; when installed pandas parses Excel files much faster with it
+EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') else None
+
+# Fallback Excel readers by extension, so pandas doesn't have to sniff the format
+EXCEL_FALLBACK_ENGINES = {'.xlsx': 'openpyxl', '.xlsm': 'openpyxl', '.xls': 'xlrd'}
+
+# Column names that look like monthly/quarterly periods (FY2025-04, 2026-01, Q1 2027, ...)
+MONTHLY_COLUMN_PATTERN = re.compile(r'FY20[23]|20(?:2[4-9]|30)-|Q[1-4] ')
+# Year inside a period column name, and the year/month of 'YYYY-MM' / 'FYYYYY-MM' names
+YEAR_PATTERN = re.compile(r'(202[0-9]|203[0-9])')
+PERIOD_PATTERN = re.compile(r'^\s*(?:FY)?\s*(\d+)\s*-\s*(\d+)\s*(?:-|$)')
+
 # Page configuration
 st.set_page_config(
     page_title="Enhanced Financial Forecasting Platform",
@@ -42,11 +56,12 @@ st.markdown("""
     .status-complete { background-color: #28a74520; border: 1px solid #28a74540; color: #28a745; }
     .status-pending { background-color: #ffc10720; border: 1px solid #ffc10740; color: #ffc107; }
     .status-in-progress { background-color: #007bff20; border: 1px solid #007bff40; color: #007bff; }
+    .status-row { display: grid; grid-template-columns: repeat(5, 1fr); gap: 1rem; margin-bottom: 1rem; }
 </style>
 """, unsafe_allow_html=True)
 
-def show_status_badge(status, label=""):
-    """Display status badges with consistent styling"""
+def status_badge_html(status, label=""):
+    """HTML for a status badge, so several badges can be rendered in one element"""
     icons = {
         'complete': '✅',
         'pending': '⏳', 
@@ -55,7 +70,11 @@ def show_status_badge(status, label=""):
     }
     
     icon = icons.get(status, '❓')
-    st.markdown(f'<span class="status-badge status-{status}">{icon} {label}</span>', unsafe_allow_html=True)
+    return f'<span class="status-badge status-{status}">{icon} {label}</span>'
+
+def show_status_badge(status, label=""):
+    """Display status badges with consistent styling"""
+    st.markdown(status_badge_html(status, label), unsafe_allow_html=True)
 
 def show_progress_indicator(current_step, total_steps, step_names):
     """Show workflow progress"""
@@ -85,11 +104,11 @@ def show_workflow_sidebar():
         ("Generate Reports", hasattr(st.session_state, 'reports_ready') and st.session_state.reports_ready)
     ]
     
-    for step_name, completed in steps:
-        if completed:
-            st.sidebar.markdown(f"✅ {step_name}")
-        else:
-            st.sidebar.markdown(f"⏳ {step_name}")
+    # All steps in one element rather than one markdown call per step
+    st.sidebar.markdown(
+        "<br>".join(f"{'✅' if completed else '⏳'} {step_name}" for step_name, completed in steps),
+        unsafe_allow_html=True
+    )
     
     st.sidebar.markdown("---")
     st.sidebar.markdown("## ⚡ Quick Actions")
@@ -104,72 +123,87 @@ def show_workflow_sidebar():
         st.sidebar.success("Data cleared!")
         st.rerun()
 
+@st.cache_data(show_spinner=False, max_entries=4, ttl=3600)
+def _read_bytes(name, blob):
+    """Parse uploaded file bytes, cached on the file name and contents"""
+    if name.endswith('.csv'):
+        return pd.read_csv(io.BytesIO(blob))
+    
+    fallback_engine = EXCEL_FALLBACK_ENGINES.get(os.path.splitext(name)[1].lower())
+    engine = EXCEL_ENGINE or fallback_engine
+    try:
+        workbook = pd.ExcelFile(io.BytesIO(blob), engine=engine)
+        top_rows = workbook.parse(0, header=None, nrows=3)
+    except Exception:
+        if engine == fallback_engine:
+            raise
+        workbook = pd.ExcelFile(io.BytesIO(blob), engine=fallback_engine)
+        top_rows = workbook.parse(0, header=None, nrows=3)
+    
+    with workbook:
+        # Pick the header row from the first rows, then parse the sheet once
+        for header_row in range(len(top_rows)):
+            if top_rows.iloc[header_row].isna().sum() < top_rows.shape[1] * 0.3:
+                st.info(f"✅ Using header row {header_row + 1}")
+                return workbook.parse(0, header=header_row)
+        
+        st.warning("⚠️ Using default headers")
+        return workbook.parse(0, header=0)
+
 def read_file_smart(file):
     """Smart file reader with enhanced error handling"""
     try:
-        if file.name.endswith('.csv'):
-            df = pd.read_csv(file)
-        else:
-            # Try different header rows for Excel files
-            df = None
-            for header_row in [0, 1, 2]:
-                try:
-                    test_df = pd.read_excel(file, header=header_row)
-                    unnamed_count = sum(1 for col in test_df.columns if 'Unnamed' in str(col))
-                    
-                    if unnamed_count < len(test_df.columns) * 0.3:
-                        df = test_df
-                        st.info(f"✅ Using header row {header_row + 1}")
-                        break
-                except:
-                    continue
-            
-            if df is None:
-                df = pd.read_excel(file, header=0)
-                st.warning("⚠️ Using default headers")
-        
-        return df
+        return _read_bytes(file.name, file.getvalue())
     except Exception as e:
         st.error(f"❌ Error reading file: {e}")
         return None
 
+def _has_numeric_values(series):
+    """True if any cell in the column parses as a number"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.notna().any()
+    return pd.to_numeric(series, errors='coerce').notna().any()
+
+@st.cache_data(show_spinner=False)
 def find_monthly_columns(df):
     """Enhanced monthly column detection"""
-    monthly_patterns = [
-        'FY202', 'FY203',  # FY2025-04, FY2030-12, etc.
-        '2024-', '2025-', '2026-', '2027-', '2028-', '2029-', '2030-',
-        'Q1 ', 'Q2 ', 'Q3 ', 'Q4 ',
-    ]
-    
-    monthly_cols = []
     current_year = datetime.now().year
     
-    for col in df.columns:
-        col_str = str(col)
-        if any(pattern in col_str for pattern in monthly_patterns):
+    numeric_cols = []
+    for col, series in df.items():
+        if MONTHLY_COLUMN_PATTERN.search(str(col)):
             try:
-                numeric_count = pd.to_numeric(df[col], errors='coerce').notna().sum()
-                if numeric_count > 0:
-                    year = extract_year_from_column(col)
-                    col_info = {
-                        'name': col,
-                        'year': year,
-                        'is_future': year > current_year,
-                        'is_historical': year <= current_year
-                    }
-                    monthly_cols.append(col_info)
-            except:
+                if _has_numeric_values(series):
+                    numeric_cols.append(col)
+            except Exception:
                 continue
     
-    return monthly_cols
+    # Years for all detected columns in one vectorized pass over the names
+    years = (
+        pd.Series(numeric_cols, dtype=object).astype(str)
+        .str.extract(YEAR_PATTERN)[0]
+        .fillna(current_year)
+        .astype(int)
+        .tolist()
+    )
+    
+    return [
+        {
+            'name': col,
+            'year': year,
+            'is_future': year > current_year,
+            'is_historical': year <= current_year
+        }
+        for col, year in zip(numeric_cols, years)
+    ]
 
-def extract_year_from_column(col_name):
-    """Extract year from column name"""
-    col_str = str(col_name)
-    year_match = re.search(r'(202[0-9]|203[0-9])', col_str)
-    if year_match:
-        return int(year_match.group(1))
-    return datetime.now().year
+def parse_dates_from_columns(col_names):
+    """Parse year and month from period column names, defaulting to January of the current year"""
+    parts = pd.Series(col_names, dtype=object).astype(str).str.extract(PERIOD_PATTERN)
+    return pd.DataFrame({
+        'year': pd.to_numeric(parts[0]).fillna(datetime.now().year).astype(int).to_numpy(),
+        'month': pd.to_numeric(parts[1]).fillna(1).astype(int).to_numpy()
+    }, index=pd.Index(col_names, name='column', dtype=object))
 
 def create_simple_mapping_interface(df, monthly_cols):
     """Simplified mapping interface that works"""
@@ -225,87 +259,59 @@ def create_simple_mapping_interface(df, monthly_cols):
     
     return mapping
 
+@st.cache_data(show_spinner=False)
 def process_enhanced_data(df, mapping, monthly_cols):
     """Process data with enhanced error handling"""
+    project_fields = {
+        'project_id': 'id', 'name': 'name', 'client': 'client', 'status': 'status',
+        'offering': 'offering', 'industry': 'industry', 'sales_org': 'sales_org', 'total_value': 'total_value'
+    }
     
-    # Create projects dataframe
-    projects = []
-    for idx, row in df.iterrows():
-        project = {
-            'project_id': row.get(mapping.get('id', ''), f"PROJ_{idx+1}"),
-            'name': row.get(mapping.get('name', ''), f"Project {idx+1}"),
-            'client': row.get(mapping.get('client', ''), "Unknown"),
-            'status': row.get(mapping.get('status', ''), "Active"),
-            'offering': row.get(mapping.get('offering', ''), "Not Specified"),
-            'industry': row.get(mapping.get('industry', ''), "Not Specified"),
-            'sales_org': row.get(mapping.get('sales_org', ''), "Not Specified"),
-        }
-        
-        total_value = row.get(mapping.get('total_value', ''), 0)
-        try:
-            project['total_value'] = float(total_value) if pd.notna(total_value) else 0
-        except:
-            project['total_value'] = 0
-            
-        projects.append(project)
+    # Create projects dataframe: mapped columns are selected and renamed in one step
+    mapped = {field: mapping.get(key) for field, key in project_fields.items() if mapping.get(key) in df.columns}
+    projects_df = df[list(mapped.values())].set_axis(list(mapped), axis=1)
+    
+    # Unmapped fields get their defaults
+    row_numbers = pd.Series(np.arange(1, len(df) + 1), index=df.index).astype(str)
+    defaults = {
+        'project_id': 'PROJ_' + row_numbers,
+        'name': 'Project ' + row_numbers,
+        'client': "Unknown",
+        'status': "Active",
+        'offering': "Not Specified",
+        'industry': "Not Specified",
+        'sales_org': "Not Specified",
+        'total_value': 0.0,
+    }
+    projects_df = projects_df.assign(**{
+        field: default for field, default in defaults.items() if field not in mapped
+    })[list(project_fields)]
+    projects_df['total_value'] = pd.to_numeric(projects_df['total_value'], errors='coerce').fillna(0.0)
+    
+    # Process monthly data: melt to one row per project/month and keep positive revenue
+    monthly_names = [col_info['name'] for col_info in monthly_cols]
+    long_df = (
+        df[monthly_names]
+        .assign(project_id=projects_df['project_id'])
+        .melt(id_vars='project_id', var_name='column', value_name='revenue')
+    )
+    long_df['revenue'] = pd.to_numeric(long_df['revenue'], errors='coerce')
+    long_df = long_df[long_df['revenue'] > 0]
     
-    projects_df = pd.DataFrame(projects)
+    # Dates and historical/future flags are looked up once per column
+    col_meta = parse_dates_from_columns(monthly_names)
+    col_meta['is_historical'] = np.array([c['is_historical'] for c in monthly_cols], dtype=bool)
+    col_meta['is_future'] = np.array([c['is_future'] for c in monthly_cols], dtype=bool)
+    col_meta['period'] = col_meta['year'].astype(str) + '-' + col_meta['month'].astype(str).str.zfill(2)
     
-    # Process monthly data
-    monthly_data = []
-    for idx, row in df.iterrows():
-        project_id = row.get(mapping.get('id', ''), f"PROJ_{idx+1}")
-        
-        for col_info in monthly_cols:
-            col = col_info['name']
-            value = row[col]
-            if pd.notna(value) and value != 0:
-                try:
-                    revenue = float(value)
-                    if revenue > 0:
-                        year, month = parse_date_from_column(col)
-                        
-                        monthly_data.append({
-                            'project_id': project_id,
-                            'year': year,
-                            'month': month,
-                            'column': col,
-                            'revenue': revenue,
-                            'period': f"{year}-{month:02d}",
-                            'is_historical': col_info['is_historical'],
-                            'is_future': col_info['is_future']
-                        })
-                except:
-                    continue
-    
-    monthly_df = pd.DataFrame(monthly_data)
-    return projects_df, monthly_df
-
-def parse_date_from_column(col_name):
-    """Parse year and month from column name"""
-    col_str = str(col_name)
+    monthly_df = long_df.join(col_meta, on='column')[
+        ['project_id', 'year', 'month', 'column', 'revenue', 'period', 'is_historical', 'is_future']
+    ].reset_index(drop=True)
     
-    if 'FY' in col_str and '-' in col_str:
-        try:
-            parts = col_str.split('-')
-            year = int(parts[0].replace('FY', ''))
-            month = int(parts[1])
-            return year, month
-        except:
-            pass
-    
-    if '-' in col_str:
-        try:
-            parts = col_str.split('-')
-            if len(parts) >= 2:
-                year = int(parts[0])
-                month = int(parts[1])
-                return year, month
-        except:
-            pass
-    
-    return datetime.now().year, 1
+    projects_df = projects_df.reset_index(drop=True)
+    return projects_df, monthly_df
 
+@st.cache_data(show_spinner=False)
 def generate_enhanced_scenarios(monthly_df):
     """Generate scenarios with enhanced analytics"""
     scenarios = {}
@@ -472,24 +478,16 @@ def show_data_upload_section():
 def show_enhanced_tabbed_interface():
     """Enhanced tabbed interface"""
     
-    # Tab status indicators
-    col1, col2, col3, col4, col5 = st.columns(5)
-    
-    with col1:
-        show_status_badge('complete')
-        st.write("Data Integrity")
-    with col2:
-        show_status_badge('complete')
-        st.write("Dashboard")
-    with col3:
-        show_status_badge('in_progress')
-        st.write("Analytics")
-    with col4:
-        show_status_badge('pending')
-        st.write("Assumptions")
-    with col5:
-        show_status_badge('pending')
-        st.write("Reports")
+    # Tab status indicators, one grid cell per tab in a single element
+    tab_statuses = [
+        ('complete', "Data Integrity"),
+        ('complete', "Dashboard"),
+        ('in_progress', "Analytics"),
+        ('pending', "Assumptions"),
+        ('pending', "Reports")
+    ]
+    badges = "".join(f"<div>{status_badge_html(status)}<div>{label}</div></div>" for status, label in tab_statuses)
+    st.markdown(f'<div class="status-row">{badges}</div>', unsafe_allow_html=True)
     
     # Tabs
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -538,35 +536,40 @@ def show_data_integrity_tab():
         st.markdown("### 📈 Monthly Revenue Data")
         st.dataframe(st.session_state.monthly_df.head(20), use_container_width=True)
 
+@st.fragment
+def _scenario_fragment():
+    """Scenario selector, metrics and chart; changing the scenario reruns only this section"""
+    # Scenario selector
+    scenario = st.selectbox("📈 Select Scenario", list(st.session_state.scenarios.keys()))
+    
+    # Metrics
+    scenario_data = st.session_state.scenarios[scenario]
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("💰 Total Revenue", f"${scenario_data['total_revenue']:,.0f}")
+    with col2:
+        st.metric("📊 Multiplier", f"{scenario_data['multiplier']:.0%}")
+    with col3:
+        st.metric("📅 Avg Monthly", f"${scenario_data['avg_monthly']:,.0f}")
+    
+    # Chart
+    monthly_totals = scenario_data['monthly_totals']
+    if not monthly_totals.empty:
+        fig = px.line(
+            monthly_totals, 
+            x='period', 
+            y='revenue_adjusted',
+            title=f"{scenario} Scenario - Revenue Forecast"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
 def show_forecast_dashboard_tab():
     """Forecast dashboard tab"""
     st.markdown("## 📊 Interactive Forecast Dashboard")
     
     if hasattr(st.session_state, 'scenarios'):
-        # Scenario selector
-        scenario = st.selectbox("📈 Select Scenario", list(st.session_state.scenarios.keys()))
-        
-        # Metrics
-        scenario_data = st.session_state.scenarios[scenario]
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric("💰 Total Revenue", f"${scenario_data['total_revenue']:,.0f}")
-        with col2:
-            st.metric("📊 Multiplier", f"{scenario_data['multiplier']:.0%}")
-        with col3:
-            st.metric("📅 Avg Monthly", f"${scenario_data['avg_monthly']:,.0f}")
-        
-        # Chart
-        monthly_totals = scenario_data['monthly_totals']
-        if not monthly_totals.empty:
-            fig = px.line(
-                monthly_totals, 
-                x='period', 
-                y='revenue_adjusted',
-                title=f"{scenario} Scenario - Revenue Forecast"
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        _scenario_fragment()
 
 def show_export_tab():
     """Export tab"""
@@ -93,8 +93,8 @@ class PLDataProcessor:
         
         categorized = {}
         
-        for idx, row in df.iterrows():
-            line_item = str(row[line_item_col]).lower().strip()
+        for idx, value in zip(df.index, df[line_item_col]):
+            line_item = str(value).lower().strip()
             
             for category, keywords in self.pl_categories.items():
                 if any(keyword in line_item for keyword in keywords):
@@ -102,7 +102,7 @@ class PLDataProcessor:
                         categorized[category] = []
                     categorized[category].append({
                         'row_index': idx,
-                        'line_item': row[line_item_col],
+                        'line_item': value,
                         'original_text': line_item
                     })
                     break
@@ -186,9 +186,20 @@ class PLDataProcessor:
         # Process P&L data
         pl_data = []
         
-        for idx, row in df.iterrows():
-            line_item = row[line_item_col]
-            entity = row[entity_col] if entity_col else "Default"
+        # Date fields depend only on the column, so work them out once
+        month_info = []
+        for col_info in monthly_cols:
+            year, month = self._parse_date_from_column(col_info['name'])
+            month_info.append((year, month, f"{year}-{month:02d}", col_info['is_historical'], col_info['is_future']))
+        
+        # Plain tuples from itertuples avoid building a Series for every row
+        columns = [line_item_col] + [col_info['name'] for col_info in monthly_cols]
+        if entity_col:
+            columns.append(entity_col)
+        
+        for values in df[columns].itertuples(index=False, name=None):
+            line_item = values[0]
+            entity = values[-1] if entity_col else "Default"
             
             # Skip empty line items
             if pd.isna(line_item) or str(line_item).strip() == '':
@@ -198,28 +209,24 @@ class PLDataProcessor:
             category = self._get_line_item_category(str(line_item))
             
             # Extract monthly values
-            for col_info in monthly_cols:
-                col = col_info['name']
-                value = row[col]
-                
+            for value, (year, month, period, is_historical, is_future) in zip(values[1:], month_info):
                 if pd.notna(value):
                     try:
                         amount = float(value)
-                        year, month = self._parse_date_from_column(col)
-                        
-                        pl_data.append({
-                            'entity': entity,
-                            'line_item': line_item,
-                            'category': category,
-                            'year': year,
-                            'month': month,
-                            'period': f"{year}-{month:02d}",
-                            'amount': amount,
-                            'is_historical': col_info['is_historical'],
-                            'is_future': col_info['is_future']
-                        })
-                    except:
+                    except (TypeError, ValueError):
                         continue
+                    
+                    pl_data.append({
+                        'entity': entity,
+                        'line_item': line_item,
+                        'category': category,
+                        'year': year,
+                        'month': month,
+                        'period': period,
+                        'amount': amount,
+                        'is_historical': is_historical,
+                        'is_future': is_future
+                    })
         
         pl_df = pd.DataFrame(pl_data)
         
@@ -294,15 +301,20 @@ class PLDataProcessor:
     def aggregate_forecast_and_pl(self, forecast_df, pl_df):
         """Aggregate forecast revenue data with P&L data"""
         
+        # Sum in float64: callers may keep amounts as float32, which loses whole dollars over many rows
+        forecast_df = forecast_df.assign(revenue=forecast_df['revenue'].astype('float64'))
+        pl_revenue_rows = pl_df[pl_df['category'] == 'revenue']
+        pl_revenue_rows = pl_revenue_rows.assign(amount=pl_revenue_rows['amount'].astype('float64'))
+        
         # Aggregate forecast revenue by period
-        forecast_summary = forecast_df.groupby('period').agg({
+        forecast_summary = forecast_df.groupby('period', observed=True).agg({
             'revenue': 'sum',
             'project_id': 'nunique'
         }).reset_index()
         forecast_summary.columns = ['period', 'forecast_revenue', 'project_count']
         
         # Get P&L revenue by period
-        pl_revenue = pl_df[pl_df['category'] == 'revenue'].groupby('period').agg({
+        pl_revenue = pl_revenue_rows.groupby('period').agg({
             'amount': 'sum'
         }).reset_index()
         pl_revenue.columns = ['period', 'pl_revenue']
@@ -328,8 +340,9 @@ class PLDataProcessor:
         }
         
         # Summary metrics
-        total_forecast_revenue = forecast_df['revenue'].sum()
-        total_pl_revenue = pl_df[pl_df['category'] == 'revenue']['amount'].sum()
+        # float64 sums, as in aggregate_forecast_and_pl
+        total_forecast_revenue = forecast_df['revenue'].astype('float64').sum()
+        total_pl_revenue = pl_df.loc[pl_df['category'] == 'revenue', 'amount'].astype('float64').sum()
         
         insights['summary_metrics'] = {
             'total_forecast_revenue': total_forecast_revenue,
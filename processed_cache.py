@@ -0,0 +1,108 @@
+"""
+Processed Cache - Optional Parquet checkpoints of processed upload data
+Off unless FINANCIAL_FORECASTING_DISK_CACHE=1 is set, so nothing is written to disk by default
+"""
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+import hashlib
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever processing code or the processed frame schema changes, so old checkpoints are never served
+CACHE_VERSION = 1
+
+CACHE_ENABLED = os.environ.get('FINANCIAL_FORECASTING_DISK_CACHE', '').lower() in ('1', 'true', 'yes')
+CACHE_DIR = Path(os.environ.get('FINANCIAL_FORECASTING_CACHE_DIR', Path.home() / '.cache' / 'financial_forecasting'))
+
+# The directory is shared by every session, so keep it bounded by entry count and age
+MAX_ENTRIES = 32
+TTL_SECONDS = 7 * 24 * 3600
+
+def processed_cache_key(namespace, file_hash, mapping):
+    """Cache key for processed frames: cache version, processing step, file contents, mapping and year"""
+    # is_historical / is_future depend on the current year, so it is part of the key
+    key_source = (
+        f"v{CACHE_VERSION}|{namespace}|{file_hash}|"
+        f"{sorted((k, str(v)) for k, v in mapping.items())}|{datetime.now().year}"
+    )
+    return hashlib.blake2b(key_source.encode(), digest_size=16).hexdigest()
+
+def _entry_paths(cache_key, names):
+    return [CACHE_DIR / f"{cache_key}_{name}.parquet" for name in names]
+
+def _remember_key(cache_key):
+    """Track keys this session touched so Clear All Data can remove them"""
+    st.session_state.setdefault('_processed_cache_keys', set()).add(cache_key)
+
+def load_processed(cache_key, names):
+    """Load processed frames from the Parquet cache, or None if disabled, missing or expired"""
+    if not CACHE_ENABLED:
+        return None
+    
+    paths = _entry_paths(cache_key, names)
+    try:
+        if any(time.time() - path.stat().st_mtime > TTL_SECONDS for path in paths):
+            return None
+        frames = tuple(pd.read_parquet(path) for path in paths)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Could not read processed cache entry %s: %s", cache_key, e)
+        return None
+    
+    _remember_key(cache_key)
+    return frames
+
+def save_processed(cache_key, frames):
+    """Write processed frames to the Parquet cache and prune old entries; failures only cost the speed-up"""
+    if not CACHE_ENABLED:
+        return
+    
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for name, frame in frames.items():
+            frame.to_parquet(CACHE_DIR / f"{cache_key}_{name}.parquet", compression='zstd')
+    except Exception as e:
+        logger.warning("Could not write processed cache entry %s: %s", cache_key, e)
+        return
+    
+    _remember_key(cache_key)
+    prune_processed()
+
+def prune_processed():
+    """Drop entries older than TTL_SECONDS, then all but the MAX_ENTRIES most recent"""
+    entries = {}
+    for path in CACHE_DIR.glob('*.parquet'):
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        cache_key = path.stem.split('_', 1)[0]
+        paths, newest = entries.get(cache_key, ([], 0))
+        entries[cache_key] = (paths + [path], max(newest, mtime))
+    
+    now = time.time()
+    by_age = sorted(entries.values(), key=lambda entry: entry[1], reverse=True)
+    for rank, (paths, newest) in enumerate(by_age):
+        if rank >= MAX_ENTRIES or now - newest > TTL_SECONDS:
+            _delete_paths(paths)
+
+def clear_session_processed():
+    """Delete the checkpoints this session loaded or wrote"""
+    for cache_key in st.session_state.pop('_processed_cache_keys', set()):
+        _delete_paths(CACHE_DIR.glob(f"{cache_key}_*.parquet"))
+
+def _delete_paths(paths):
+    for path in paths:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Could not delete processed cache file %s: %s", path, e)
@@ -63,8 +63,11 @@ class SmartColumnDetector:
         
         results = {}
         
+        # Score each column against every field once, then pick candidates per field
+        column_scores = [self._score_column(df, col) for col in df.columns]
+        
         for field, config in self.field_patterns.items():
-            candidates = self._find_field_candidates(df, field, config)
+            candidates = self._find_field_candidates(df, field, config, column_scores)
             if candidates:
                 results[field] = candidates
         
@@ -75,13 +78,20 @@ class SmartColumnDetector:
         
         return results
     
-    def _find_field_candidates(self, df, field, config):
+    def _score_column(self, df, column):
+        """Confidence scores of one column for every field"""
+        return {
+            field: self._calculate_confidence_score(df, column, field, config)
+            for field, config in self.field_patterns.items()
+        }
+    
+    def _find_field_candidates(self, df, field, config, column_scores):
         """Find candidates for a specific field with confidence scoring"""
         
         candidates = []
         
-        for col in df.columns:
-            confidence_score = self._calculate_confidence_score(df, col, field, config)
+        for col, scores in zip(df.columns, column_scores):
+            confidence_score = scores[field]
             
             if confidence_score > 0.3:  # Minimum threshold
                 candidates.append({
@@ -273,15 +283,18 @@ class SmartColumnDetector:
         monthly_candidates.sort(key=lambda x: x['confidence'], reverse=True)
         return monthly_candidates
 
+@st.cache_data(show_spinner=False, max_entries=8)
+def detect_columns_cached(df):
+    """Detection results cached per frame, so reruns of the mapping interface skip the column scoring"""
+    return SmartColumnDetector().detect_columns_with_confidence(df)
+
 def show_smart_mapping_interface(df):
     """Enhanced mapping interface with smart suggestions"""
     
     st.markdown("### 🧠 Smart Column Detection")
     
-    detector = SmartColumnDetector()
-    
     with st.spinner("Analyzing columns..."):
-        detection_results = detector.detect_columns_with_confidence(df)
+        detection_results = detect_columns_cached(df)
     
     if not detection_results:
         st.warning("No suitable columns detected. Please map manually.")
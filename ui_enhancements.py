@@ -3,6 +3,8 @@ import pandas as pd
 from datetime import datetime
 import time
 
+from processed_cache import clear_session_processed
+
 def show_progress_indicator(current_step, total_steps, step_names=None):
     """Enhanced progress indicator with step names and status"""
     
@@ -24,8 +26,8 @@ def show_progress_indicator(current_step, total_steps, step_names=None):
             else:
                 st.write(f"⏳ {step_name}")
 
-def show_status_badge(status, label="Status"):
-    """Display status badges with consistent styling"""
+def status_badge_html(status):
+    """HTML for a status badge, so several badges can be rendered in one element"""
     
     status_config = {
         'complete': {'color': 'green', 'icon': '✅', 'text': 'Complete'},
@@ -38,7 +40,7 @@ def show_status_badge(status, label="Status"):
     
     config = status_config.get(status.lower(), status_config['info'])
     
-    st.markdown(f"""
+    return f"""
     <div style="
         display: inline-block;
         padding: 4px 8px;
@@ -52,7 +54,11 @@ def show_status_badge(status, label="Status"):
     ">
         {config['icon']} {config['text']}
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+def show_status_badge(status, label="Status"):
+    """Display status badges with consistent styling"""
+    st.markdown(status_badge_html(status), unsafe_allow_html=True)
 
 def show_help_tooltip(text, help_text):
     """Display text with contextual help tooltip"""
@@ -88,7 +94,7 @@ def enhanced_file_uploader(label, help_text=None, accepted_types=None):
     
     if uploaded_file is not None:
         # File info display
-        file_size = len(uploaded_file.getvalue())
+        file_size = uploaded_file.size
         file_size_mb = file_size / (1024 * 1024)
         
         col1, col2, col3 = st.columns(3)
@@ -273,6 +279,7 @@ def show_workflow_sidebar():
         st.sidebar.success("Progress saved!")
     
     if st.sidebar.button("🗑️ Clear All Data"):
+        clear_session_processed()
         for key in list(st.session_state.keys()):
             if not key.startswith('_'):
                 del st.session_state[key]